@@ -0,0 +1,290 @@
+# docstring
+'''
+    Benchmarks for the function libraries. Run as a script:
+        python benchmark.py                     - run every workload
+        python benchmark.py solve_r pv          - run the workloads whose names contain any of the words
+        python benchmark.py --save base.json    - also save the results as a baseline
+        python benchmark.py --compare base.json - also compare the results against a saved baseline
+        python benchmark.py --exact             - float vs exact (decimal) TVM functions
+        python benchmark.py --latency           - scalar per-call latency, python vs numba backend
+        python benchmark.py --imports           - cold import time of the libraries (works with
+                                                  --save and --compare)
+
+    Contains the following benchmarks:
+    workloads()     - the realistic business.py workloads the suite times
+    run()           - times workloads, measuring calls/sec and peak memory
+    report()        - prints results, with the speed-up against a baseline
+    save()          - saves results as a JSON baseline
+    load()          - loads a saved baseline
+    exact_mode()    - per-call time of float vs exact (decimal) pv(), fv(), solve_t(), solve_q()
+    latency()       - per-call time of the scalar workloads under each business.py backend
+    import_times()  - cold import time and memory of each library, in fresh interpreters
+'''
+
+# imports
+from timeit import default_timer
+from timeit import repeat
+from itertools import cycle
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import numpy as np
+import business
+import dates
+
+# Functions
+def per_call(function,number=1000,repeats=5):
+    # docstring
+    '''
+        Returns the best per-call time in seconds of function() over repeats runs of
+        number calls each.
+    '''
+    best = min(repeat(function,number=number,repeat=repeats))
+    return best / number
+
+def workloads():
+    # docstring
+    '''
+        Returns the benchmark workloads as a list of (name, function, number) where
+        function() is one call of the workload and number is how many calls make one
+        timing run. Inputs are generated from a fixed seed so runs are reproducible.
+    '''
+    rng = np.random.default_rng(20120719)
+
+    #   an irregular 1,000-payment stream, and conventional/mixed-sign IRR streams
+    stream = list(np.round(rng.uniform(-200,1000,1000),2))
+    irr_mixed = [-1000,300,420,-150,680,250,-90,510]
+    loan = dict(pv=250000,q=1342.05,t=360)
+
+    #   distinct rates, more than the rate cache holds, for calls that miss it
+    fresh = cycle(rng.uniform(.02,.08,50000).tolist())
+
+    #   a portfolio of 10,000 level-payment loans
+    size = 10000
+    rate = rng.uniform(.02,.08,size)
+    term = rng.integers(10,31,size).astype(float)
+    principal = np.round(rng.uniform(5e4,5e5,size),2)
+    due = rng.random(size) < .1
+    payment = business.solve_q_batch(rate,term,pv=principal,q_per_t=12)
+    flows = np.full((1000,360),1342.05)
+    scenarios = business.rate_paths(.05,30,10000,q_per_t=12,seed=20120719,volatility=.01)
+    #   100,000 date strings in the fixed formats, with repeats, and irregular ones
+    days = np.datetime64('2000-01-01') + rng.integers(0,9000,100000)
+    fixed = np.char.replace(days.astype(str),'-','')
+    irregular = np.array(['July %d, 2012' % (k % 28 + 1) for k in range(1000)])
+    dated = np.datetime64('2012-07-19') + np.sort(rng.integers(0,3650,1000))
+    dated_q = np.round(rng.uniform(-200,1000,1000),2)
+    dated_q[0] = -250000
+    borrowed = np.round(rng.uniform(2e5,3e5,1000),2)
+
+    return [
+        ('rates',lambda: business.rates(.05,r_is='d',q_per_t=12),10000),
+        ('pv mortgage',lambda: business.pv(.05,30,q=1342.05,q_per_t=12),10000),
+        ('pv mortgage uncached rate',lambda: business.pv(next(fresh),30,q=1342.05,q_per_t=12),10000),
+        ('fv mortgage',lambda: business.fv(.05,30,q=1342.05,q_per_t=12),10000),
+        ('pv stream 1000',lambda: business.pv(.05,q=stream,q_per_t=12),1000),
+        ('fv stream 1000',lambda: business.fv(.05,q=stream,q_per_t=12),1000),
+        ('solve_t mortgage',lambda: business.solve_t(.05,pv=250000,q=1342.05,q_per_t=12),10000),
+        ('solve_q mortgage',lambda: business.solve_q(.05,30,pv=250000,q_per_t=12),10000),
+        ('sensitivity mortgage',lambda: business.sensitivity(.05,30,q=1342.05,q_per_t=12),10000),
+        ('solve_r mortgage',lambda: business.solve_r(get='i',**loan),100),
+        ('solve_r mixed-sign',lambda: business.solve_r(q=irr_mixed,get='i'),1000),
+        ('xpv dated 1000',lambda: business.xpv(.05,dated,dated_q),1000),
+        ('xirr dated 1000',lambda: business.xirr(dated,dated_q,get='i'),1000),
+        ('date_array fixed 100k',lambda: dates.date_array(fixed),10),
+        ('date_array irregular 1000',lambda: dates.date_array(irregular),10),
+        ('datedif_array months 100k',lambda: dates.datedif_array(days,days[::-1],'m'),10),
+        ('datedif_array exact years 100k',lambda: dates.datedif_array(days,days[::-1],'y',exact=True),10),
+        ('dateMath_array roll 100k',lambda: dates.dateMath_array(days,months=1),10),
+        ('eoMonth_array 100k',lambda: dates.eoMonth_array(days),10),
+        ('yearfrac 30/360 100k',lambda: dates.yearfrac(days,days[::-1],'30/360'),10),
+        ('yearfrac ACT/ACT 100k',lambda: dates.yearfrac(days,days[::-1],'ACT/ACT'),10),
+        ('julian',lambda: dates.julian('20120719'),10000),
+        ('julian_array 100k',lambda: dates.julian_array(days),10),
+        ('weekNum_array 100k',lambda: dates.weekNum_array(days),10),
+        ('pv_batch portfolio 10k',lambda: business.pv_batch(rate,term,q=payment,q_per_t=12,annuity_due=due),10),
+        ('solve_q_batch portfolio 10k',lambda: business.solve_q_batch(rate,term,pv=principal,q_per_t=12),10),
+        ('sensitivity_batch portfolio 10k',lambda: business.sensitivity_batch(rate,term,q=payment,q_per_t=12,annuity_due=due),10),
+        ('pv_monte_carlo mortgage 10k paths',lambda: business.pv_monte_carlo(scenarios,q=1342.05,q_per_t=12,chunk_size=2000),1),
+        ('solve_r_batch portfolio 1k',lambda: business.solve_r_batch(flows,pv=borrowed),1),
+        ('amortize_batch portfolio 1k',lambda: business.amortize_batch(rate[:1000],term[:1000],pv=principal[:1000],q_per_t=12),1),
+    ]
+
+def run(names=None,repeats=5):
+    # docstring
+    '''
+        Times the workloads whose names contain any of the given words (all workloads if
+        names is not given). Returns {name: {'calls_per_sec':..., 'peak_kb':...}} where
+        calls_per_sec is from the best of repeats timing runs and peak_kb is the peak
+        memory traced during a single call.
+    '''
+    results = {}
+    for name,function,number in workloads():
+        if names and not any(word in name for word in names):
+            continue
+        function()
+        seconds = per_call(function,number,repeats)
+
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {'calls_per_sec':1 / seconds,'peak_kb':peak / 1024}
+    return results
+
+def report(results,baseline=None):
+    # docstring
+    '''
+        Prints results from run(), with the speed-up of each workload against baseline
+        results if given. A speed-up below 1 is a regression.
+    '''
+    header = '%-30s %14s %12s' % ('workload','calls/sec','peak KiB')
+    if baseline:
+        header += ' %14s %9s' % ('baseline','speed-up')
+    print(header)
+    for name,result in results.items():
+        line = '%-30s %14.1f %12.1f' % (name,result['calls_per_sec'],result['peak_kb'])
+        if baseline and name in baseline:
+            before = baseline[name]['calls_per_sec']
+            line += ' %14.1f %8.2fx' % (before,result['calls_per_sec'] / before)
+        print(line)
+
+def save(results,path):
+    # docstring
+    '''
+        Saves results from run() as a JSON baseline at path, with the Python, NumPy, and
+        platform versions they were measured on.
+    '''
+    baseline = {
+        'python':platform.python_version(),
+        'numpy':np.__version__,
+        'platform':platform.platform(),
+        'results':results,
+    }
+    with open(path,'w') as output:
+        json.dump(baseline,output,indent=2)
+
+def load(path):
+    # docstring
+    '''
+        Loads the baseline results saved at path by save() and returns them, keyed like
+        results from run().
+    '''
+    with open(path) as baseline:
+        return json.load(baseline)['results']
+
+def exact_mode(number=1000):
+    # docstring
+    '''
+        Compares the default float evaluation of the TVM functions against exact = True
+        (decimal) evaluation on a 30-year monthly mortgage and an irregular stream. Prints
+        the per-call time of each mode, the slowdown of exact mode, and both answers.
+    '''
+    stream = [100,-50,250,0,75] * 24
+    workloads = [
+        ('pv annuity',business.pv,dict(r=.05,t=30,q=536.82,q_per_t=12)),
+        ('pv stream',business.pv,dict(r=.05,q=stream,q_per_t=12)),
+        ('fv annuity',business.fv,dict(r=.05,t=30,q=536.82,q_per_t=12)),
+        ('solve_t',business.solve_t,dict(r=.05,pv=100000,q=536.82,q_per_t=12)),
+        ('solve_q',business.solve_q,dict(r=.05,t=30,pv=100000,q_per_t=12)),
+    ]
+
+    print('%-12s %12s %12s %8s   %s' % ('workload','float (us)','exact (us)','ratio','float / exact answer'))
+    for name,function,arguments in workloads:
+        fast = per_call(lambda: function(**arguments),number)
+        slow = per_call(lambda: function(exact=True,**arguments),number)
+        answers = '%s / %s' % (function(**arguments),function(exact=True,**arguments))
+        print('%-12s %12.2f %12.2f %8.1f   %s' % (name,fast * 1e6,slow * 1e6,slow / fast,answers))
+
+def latency(backends=('python','numba'),repeats=5):
+    # docstring
+    '''
+        Times the scalar (one request at a time) workloads under each business.py backend,
+        selected by BUSINESS_BACKEND, and prints the per-call latency of each. The backend is
+        chosen at import, so each one is timed in its own process.
+    '''
+    names = ['rates','pv mortgage','fv mortgage','solve_q mortgage','sensitivity mortgage','solve_r']
+    scalar = [name for name,function,number in workloads() if any(word in name for word in names) and 'batch' not in name]
+    timings = {}
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder,'results.json')
+            environment = dict(os.environ,BUSINESS_BACKEND=backend)
+            #   a first, untimed solve_r() call compiles (and caches) any jitted kernels,
+            #   which numba does on first call rather than on import
+            warm_up = "import business; business.solve_r(pv=250000,q=1342.05,t=360,get='i')"
+            subprocess.run([sys.executable,'-c',warm_up],env=environment,check=True)
+            command = [sys.executable,os.path.abspath(__file__),'--repeat',str(repeats),'--save',path] + scalar
+            subprocess.run(command,env=environment,check=True,stdout=subprocess.DEVNULL)
+            timings[backend] = load(path)
+
+    print(('%-30s' + ' %14s' * len(backends)) % (('workload',) + tuple(backend + ' (us)' for backend in backends)))
+    for name in scalar:
+        times = tuple(1e6 / timings[backend][name]['calls_per_sec'] for backend in backends)
+        print(('%-30s' + ' %14.2f' * len(backends)) % ((name,) + times))
+
+def import_times(modules=('business','dates','probability'),repeats=5):
+    # docstring
+    '''
+        Times a cold import of each module in a fresh interpreter, keeping the best of repeats
+        runs. Returns results keyed like run(), as 'import <module>', so import times can be
+        saved and compared against a baseline like any workload; calls_per_sec is imports per
+        second and peak_kb the peak memory traced during the import (in a separate run, as
+        tracing slows the import down).
+    '''
+    timed = 'import time\nstart = time.perf_counter()\nimport %s\nprint(time.perf_counter() - start)'
+    traced = 'import tracemalloc\ntracemalloc.start()\nimport %s\nprint(tracemalloc.get_traced_memory()[1])'
+    folder = os.path.dirname(os.path.abspath(__file__))
+
+    def child(code):
+        output = subprocess.run([sys.executable,'-c',code],cwd=folder,check=True,capture_output=True,text=True)
+        return float(output.stdout)
+
+    results = {}
+    for module in modules:
+        seconds = min(child(timed % module) for _ in range(repeats))
+        peak = child(traced % module)
+        results['import ' + module] = {'calls_per_sec':1 / seconds,'peak_kb':peak / 1024}
+    return results
+
+def main(argv=None):
+    # docstring
+    '''
+        Command line entry point, see the module docstring.
+    '''
+    parser = argparse.ArgumentParser(description='Benchmarks for the function libraries.')
+    parser.add_argument('names',nargs='*',help='only run workloads whose names contain one of these words')
+    parser.add_argument('--repeat',type=int,default=5,help='timing runs per workload (best is kept)')
+    parser.add_argument('--save',metavar='FILE',help='save the results as a JSON baseline')
+    parser.add_argument('--compare',metavar='FILE',help='compare the results against a saved baseline')
+    parser.add_argument('--exact',action='store_true',help='compare float and exact (decimal) TVM functions')
+    parser.add_argument('--latency',action='store_true',help='compare scalar latency of the python and numba backends')
+    parser.add_argument('--imports',action='store_true',help='time cold imports of the libraries instead of the workloads')
+    args = parser.parse_args(argv)
+
+    if args.exact:
+        exact_mode()
+        return
+    if args.latency:
+        latency(repeats=args.repeat)
+        return
+
+    start = default_timer()
+    if args.imports:
+        results = import_times(repeats=args.repeat)
+    else:
+        results = run(args.names,args.repeat)
+    baseline = load(args.compare) if args.compare else None
+    report(results,baseline)
+    print('%.1f seconds' % (default_timer() - start))
+    if args.save:
+        save(results,args.save)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -3,17 +3,73 @@
     Contains the following TVM business functions:
     rates()     - returns interest rates [i,d,v,delta]
     solve_r()   - solves for unknown interest rates
+    solve_r_batch() - solves for unknown interest rates of many cash-flow streams at once
+    xirr()      - solves for the interest rate of cash flows paid on given dates
     pv()        - returns present value of future cash flows
     fv()        - returns future value of present cash flows
+    pv_stream() - pv() of a payment stream consumed incrementally (generators, files)
+    fv_stream() - fv() of a payment stream consumed incrementally (generators, files)
+    xpv()       - returns present value of cash flows paid on given dates
+    discount_table() - precomputed discount/accumulation factors pv() and fv() accept as r
+    yield_curve() - term structure of interest rates pv(), fv(), and solve_q() accept as r
+    discount_factors() - discount factors of a yield curve at any times
+    sensitivity() - pv() with its duration, convexity, and DV01, in a single pass
+    rate_paths() - simulated interest rate paths from a seeded short-rate (Vasicek) model
+    pv_monte_carlo() - distribution of pv() over simulated or given interest rate paths
     solve_t()   - solves for unknown time
     solve_q()   - solves for unknown payment amount
+    amortize()  - amortization (or sinking fund) schedule of the payment from solve_q()
+    amortize_iter() - amortization schedule generated lazily, one period at a time
+    amortize_batch() - amortization schedules of many loans at once
+    pv_batch()  - vectorized pv() over NumPy arrays
+    fv_batch()  - vectorized fv() over NumPy arrays
+    solve_t_batch() - vectorized solve_t() over NumPy arrays
+    solve_q_batch() - vectorized solve_q() over NumPy arrays
+    sensitivity_batch() - vectorized sensitivity() over NumPy arrays
+
+    pv(), fv(), solve_t(), and solve_q() take exact = True (or a number of significant digits)
+    to evaluate in decimal arithmetic instead of float, for auditable answers.
+
+    Setting the environment variable BUSINESS_BACKEND=numba before import compiles the scalar
+    Newton iteration of solve_r() with numba, if it is installed. BACKEND holds the backend in
+    use, 'python' or 'numba'.
 '''
 
 # imports
 from math import exp
 from math import log
-from mpmath import polyroots
-from mpmath import ctx_mp_python
+from math import isfinite
+from collections import namedtuple
+from decimal import Context
+from decimal import Decimal
+from decimal import localcontext
+from functools import lru_cache
+import os
+import warnings
+from dates import _lazy_import
+from dates import date_array
+from dates import yearfrac
+
+#   numpy loads on first use, and mpmath only for solve_r(exact = True)
+np = _lazy_import('numpy')
+
+# Backend
+#   the scalar kernels are compiled with numba only if asked for and installed
+BACKEND = 'python'
+if os.environ.get('BUSINESS_BACKEND','python').lower() == 'numba':
+    try:
+        import numba
+        BACKEND = 'numba'
+    except ImportError:
+        warnings.warn('BUSINESS_BACKEND=numba but numba is not installed, using the python backend')
+
+# Types
+#   associated rates as returned by _rates(); rates() returns them as a dict
+Rates = namedtuple('Rates',['i','d','v','delta'])
+#   discount (v**t) and accumulation ((1+i)**t) factors for t = 0..n, see discount_table()
+DiscountTable = namedtuple('DiscountTable',['rates','q_per_t','v','accum'])
+#   spot rates i at knots t, with log discount factors on a grid of step years, see yield_curve()
+YieldCurve = namedtuple('YieldCurve',['t','i','step','log_v'])
 
 # Functions
 def rates(r,r_is=False,get=False,q_per_t=False):
@@ -67,87 +123,20 @@ def rates(r,r_is=False,get=False,q_per_t=False):
                 Decimal or float
     '''
 
-    # internal functions
-    def interest(r):
-        # calculates associated rates if r is an interest rate
-        i = r
-        d = i/(1+i)
-        v = 1-d
-        delta = exp(i)-1
-        rates = {'i':i,'d':d,'v':v,'delta':delta}
-        return rates
-
-    def discount(r):
-        # calculates associated rates if r is a discount rate
-        d = r
-        i = d/(1-d)
-        v = 1-d
-        delta = exp(i)-1
-        rates = {'i':i,'d':d,'v':v,'delta':delta}
-        return rates
-
-    def getV(r):
-        # calculates associated rates if r is a discount factor
-        v = r
-        d = 1-v
-        i = 1/v - 1
-        delta = exp(i)-1
-        rates = {'i':i,'d':d,'v':v,'delta':delta}
-        return rates
-
-    def delta(r):
-        # calculates associated rates if r is a continuously compounded interest
-        # rate
-        delta = r
-        i = log(1+delta)
-        d = i/(1+i)
-        v = 1-d
-        rates = {'i':i,'d':d,'v':v,'delta':delta}
-        return rates
-
-    def roundValues(answer):
-        # rounds all dict values to 10 decimal places
-        answer['i'] = round(answer['i'],10)
-        answer['d'] = round(answer['d'],10)
-        answer['v'] = round(answer['v'],10)
-        answer['delta'] = round(answer['delta'],10)
-        return answer
-
     # Function Body
-    #   if r_is has been specified then determine its type, else it's assumed to
-    #   be an interest rate 'i'
-    if r_is:
-        r_is = get_rType(str(r_is))
-    else:
-        r_is = 'i'
-
-    #   given r_is, call the appropriate rate calculation function
-    if r_is == 'i':
-        answer = interest(r)
-    elif r_is == 'd':
-        answer = discount(r)
-    elif r_is == 'v':
-        answer = getV(r)
-    else:
-        answer = delta(r)
-
-    #   round the resulting values to 10 decimal places
-    answer = roundValues(answer)
-
-    #   if adjust was requested, recalculate i & redo function
-    if q_per_t:
-        i = (1 + answer['i'])**(1 / q_per_t) - 1
-        answer = rates(r=i)
+    #   rates are calculated (and cached) by _rates() given the cleaned rate type
+    answer = _rates(r,_rType(r_is),q_per_t)
 
     #   if a specific value was requested via get then return that, else returns
     #   all calcualted values via the dict
     if get:
-        get = get_rType(str(get))
-        answer = answer[get]
+        answer = getattr(answer,_rType(get))
+    else:
+        answer = answer._asdict()
 
     return answer
 
-def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_t=False):
+def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_t=False,exact=False):
     # docstring
     '''
        Function Description:
@@ -168,6 +157,10 @@ def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_
 
             There is no bottom limit to negative interest rates.
 
+            By default the largest real root of the cash-flow polynomial is found in float64 by Newton's
+            method, seeded from the level-annuity approximation, with a Brent fallback on a bracket. Pass
+            exact = True to find every root with mpmath.polyroots instead (arbitrary precision, much slower).
+
         Variable/argument Description:
             pv:
                 present value of future funds/first annuity payment made to opposite to q
@@ -195,6 +188,8 @@ def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_
                 See the description in the rates() function for further explanation, but be advised that it this functions
                 inversely here as opposed to there. i.e. passing 12 in this function will mean that the returned rate
                 r is r ** 12 as opposed to r ** (1/12)
+            exact:
+                solve with mpmath.polyroots instead of the float64 root finder
 
         Acceptable argument inputs:
             q:
@@ -210,7 +205,7 @@ def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_
                     4 OR a string that starts with 'de', 'c', or 'f'
             t:
                 int only
-            annuity_due:
+            annuity_due & exact:
                 True or False
             all others:
                 int or float
@@ -231,6 +226,8 @@ def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_
         # need to create a list of payments (q).
         if isinstance(q,list) == False:
             q = [q]
+        else:
+            q = list(q)
         if t != False:
             q *= t
         if pv != False and annuity_due == True:
@@ -242,16 +239,21 @@ def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_
         elif fv != False and annuity_due == True:
             q.append(-fv)
 
-        #   find the roots of the polynomial as created above
-        real = []
-        for i in polyroots(q):
-            # we only want real numbers
-            if isinstance(i,ctx_mp_python.mpf):
-                real.append(i)
-        # we want the positive zero, if it exists, and we can't take the max of a null list
-        if real == []:
-            real = [1]
-        r = max(real)
+        #   find the largest real root of the polynomial as created above
+        if exact:
+            from mpmath import polyroots
+            from mpmath import ctx_mp_python
+            real = []
+            for i in polyroots(q):
+                # we only want real numbers
+                if isinstance(i,ctx_mp_python.mpf):
+                    real.append(i)
+            # we want the positive zero, if it exists, and we can't take the max of a null list
+            if real == []:
+                real = [1]
+            r = max(real)
+        else:
+            r = _irr(q)
         #   make r a percentage
         r = float(r - 1)
 
@@ -268,7 +270,107 @@ def solve_r(pv=False,q=False,t=False,fv=False,annuity_due=False,get=False,q_per_
 
     return r
 
-def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,precision=False):
+def solve_r_batch(q,pv=False,fv=False,annuity_due=False,q_per_t=False,tol=1e-12,maxiter=50):
+    # docstring
+    '''
+        Function Description:
+            Solves for the interest rates of many cash-flow streams at once, one stream per row
+            of q. Newton's method runs on every row simultaneously, each row starting from its
+            level-annuity approximation. Returns a dict of arrays:
+                {'i':i,'d':d,'v':v,'delta':delta,'converged':converged,'iterations':iterations}
+            where i, d, v, and delta match what rates() returns for each row, converged flags the
+            rows whose iteration converged and iterations counts the Newton steps each row took.
+
+        Calculation assumptions:
+            Each row of q is laid out the way solve_r() lays out a list q: payments are evenly
+            spaced, pv is paid opposite to q at inception and fv opposite to q one period after
+            the final payment (annuity_due == True) or with it (annuity_due == False).
+
+            Unlike solve_r(), only the root reached from the level-annuity approximation is
+            found, which for conventional streams (a single change of sign) is the only one.
+            Rows that do not converge return nan rates. Rows without both ins and outs return
+            a rate of 0 and are flagged as not converged, matching solve_r()'s error value.
+
+        Variable/argument Description:
+            q:
+                2-D array of payments, one stream per row, padded at the end with nan. A ragged
+                list of lists is padded automatically.
+            pv, fv, annuity_due, q_per_t:
+                as solve_r(), either one value for every row or an array with a value per row
+            tol:
+                relative tolerance of the Newton step on the discount factor v
+            maxiter:
+                maximum number of Newton steps
+
+        Acceptable argument inputs:
+            q:
+                2-D array or list of lists of int/float
+            annuity_due:
+                True, False, or array of booleans
+            maxiter:
+                int
+            all others:
+                int/float or array of int/float
+    '''
+
+    # Function Body
+    #   pad ragged streams with nan
+    if isinstance(q,list) and any(isinstance(row,(list,tuple,np.ndarray)) for row in q):
+        width = max(len(row) for row in q)
+        q = [list(row) + [np.nan] * (width - len(row)) for row in q]
+    q = np.atleast_2d(np.asarray(q,dtype=float))
+    rows,width = q.shape
+    count = (~np.isnan(q)).sum(axis=1)
+    q = np.nan_to_num(q)
+
+    pv = np.broadcast_to(np.asarray(pv,dtype=float),(rows,))
+    fv = np.broadcast_to(np.asarray(fv,dtype=float),(rows,))
+    annuity_due = np.broadcast_to(np.asarray(annuity_due,dtype=bool),(rows,))
+
+    #   lay out every stream as cash flows c[:,k] paid at time k
+    c = np.zeros((rows,width + 1))
+    c[:,1:] = np.where(annuity_due[:,np.newaxis],0,q)
+    c[:,:-1] += np.where(annuity_due[:,np.newaxis],q,0)
+    c[:,0] -= pv
+    c[np.arange(rows),count] -= fv
+
+    #   Newton iteration on v, the root of sum(c[:,k] * v**k), for all rows at once
+    v = 1 / (1 + _irr_seed(c))
+    columns = np.ascontiguousarray(c.T)
+    converged = np.zeros(rows,dtype=bool)
+    iterations = np.zeros(rows,dtype=int)
+    active = np.nonzero((c > 0).any(axis=1) & (c < 0).any(axis=1))[0]
+    investment = np.zeros(rows,dtype=bool)
+    investment[active] = True
+    for _ in range(maxiter):
+        if len(active) == 0:
+            break
+        with np.errstate(divide='ignore',invalid='ignore',over='ignore'):
+            value,slope = _horner(columns[:,active],v[active])
+            step = value / slope
+        v[active] -= step
+        iterations[active] += 1
+        done = np.abs(step) <= tol * np.maximum(1,np.abs(v[active]))
+        failed = ~np.isfinite(step)
+        converged[active[done]] = True
+        active = active[~done & ~failed]
+
+    #   convert v to rates, with 0 for streams that were never an investment
+    with np.errstate(divide='ignore'):
+        i = np.where(converged,1 / v - 1,np.nan)
+    i = np.where(investment,i,0)
+
+    # q_per_t functions inversely here, as in solve_r()
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    with np.errstate(divide='ignore'):
+        q_per_t = np.where(q_per_t != 0,1 / q_per_t,0)
+    answer = _rates_array(i,q_per_t=q_per_t)
+    answer['converged'] = converged
+    answer['iterations'] = iterations
+
+    return answer
+
+def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,precision=False,exact=False):
     # docstring
     '''
         Function Description:
@@ -283,7 +385,8 @@ def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cas
             Annuity payment are level/regular and interest rates do not change
 
         Variable/Argument Description:
-            r       = given interest rate
+            r       = given interest rate, or a DiscountTable (see discount_table()), or a
+                    YieldCurve (see yield_curve()) to discount each payment at its own spot rate
             r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
             t       = given time period. Usually years.
             q       = individual annuity payment amount OR cash flow stream
@@ -294,6 +397,11 @@ def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cas
             annuity_due = True if annuity due, defaults to False
             cash_today  = any cash exchanging hands today
             precision   = decimal places of answer, defaults to 2
+            exact       = evaluate in decimal arithmetic with no intermediate rounding and
+                        return a Decimal. True works to 28 significant digits, or pass the
+                        number of digits (at least 16). precision is then not limited to 16,
+                        and the pv of 1 is returned unrounded. r must be a plain rate, not a
+                        discount table or yield curve
 
         Acceptable Argument inputs:
             r           : float. 1% should be entered as .01
@@ -301,27 +409,39 @@ def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cas
             annuity_due : True or False
             precision   : integer <= 16
             q           : float/integer or list of float/integers
+            exact       : True, False, or integer >= 16
             all others  : float or integer
     '''
 
     # Function Body
     #   if 'r_is' has been specified then determine its type, else it's assumed to
     #   be an interest rate 'i'
-    if r_is:
-        r_is = get_rType(str(r_is))
-    else:
-        r_is = 'i'
+    r_is = _rType(r_is)
+
+    #   exact mode evaluates the same formulas in decimal arithmetic
+    if exact:
+        with _exact_context(exact):
+            return _pv_exact(r,t,r_is,q,fv,q_per_t,annuity_due,cash_today,precision)
+
+    #   a yield curve discounts each payment at its own spot rate
+    if isinstance(r,YieldCurve):
+        return _pv_curve(r,t,q,fv,q_per_t,annuity_due,cash_today,precision)
 
     #   establish t
     if not t:
         t = 1
 
-    #   get the appropriate rates per payment period
+    #   get the appropriate rates per payment period, from the table if given one
+    if isinstance(r,DiscountTable):
+        table = r
+        iRates = table.rates
+        q_per_t = table.q_per_t
+    else:
+        table = False
+        iRates = _rates(r,r_is,q_per_t)
     if q_per_t:
-        iRates = rates(r=r,r_is=r_is,q_per_t=q_per_t)
         t = t * q_per_t
     else:
-        iRates = rates(r=r,r_is=r_is)
         q_per_t = 1
 
     #   assign 0 to all unused/uncalled arguments for math
@@ -335,36 +455,33 @@ def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cas
 
     #   Calculate values via irregular annuity stream or standard PV
     if isinstance(q,list):
-        #   calculate pv via array method - we have an irregular annuity stream
-
-        #   variable declarations
-        pmts = []
-        t = 1
+        #   calculate pv via discount factors - we have an irregular annuity stream.
+        #   payments are made at t = 1..n, or t = 0..n-1 for an annuity due, and
+        #   the final fv adjustment is made at the time of the final payment
+        start = 1
         if annuity_due == True:
-            t = 0
-
-        #   payment loop
-        for payment in q:
-            pv_pmt = payment * iRates['v']**t
-            pmts.append(pv_pmt)
-            t += 1
+            start = 0
+        t = start + len(q) - 1
+        if table == False:
+            v = _factors(iRates.v,max(t,0))
+        elif len(table.v) > t:
+            v = table.v
+        else:
+            raise ValueError('discount table is shorter than the cash flow stream')
 
         #   present value of annuities
-        presVal = sum(pmts)
-        #   t was iterated 1 higher than necessary as loop ended, needs to be reset
-        #   so that final fv adjustment is accurate
-        t -= 1
+        presVal = float(np.dot(q,v[start:t + 1]))
 
     else:
         # calculate pv via traditional method: q is annuity or single cashflow
         #   calculate present value of annuity + future value + cash today
         if annuity_due == False:
-            presVal = q * (1 - iRates['v']**t) / iRates['i']
+            presVal = q * (1 - iRates.v**t) / iRates.i
         else:
-            presVal = q * (1 - iRates['v']**t) / iRates['d']
+            presVal = q * (1 - iRates.v**t) / iRates.d
 
     #   final step:
-    presVal += fv * iRates['v']**t
+    presVal += fv * iRates.v**t
     presVal += cash_today
 
     #   round
@@ -376,7 +493,7 @@ def pv(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cas
 
     return presVal
 
-def fv(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,future_cash=False,precision=False):
+def fv(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,future_cash=False,precision=False,exact=False):
     # docstring
     '''
         Function Description:
@@ -389,7 +506,8 @@ def fv(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,fut
             Annuity payment are level/regular and interest rates do not change
 
         Variable/Argument Description:
-            r       = given interest rate
+            r       = given interest rate, or a DiscountTable (see discount_table()), or a
+                    YieldCurve (see yield_curve()) to accumulate at the curve's forward rates
             r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
             t       = given time period. Usually years. Optional/not needed if q is a list
             q       = individual annuity payment amount OR list of payments
@@ -398,28 +516,41 @@ def fv(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,fut
             pv      = present value
             annuity_due = True if annuity due, defaults to False
             cash_today  = any cash exchanging hands today
+            exact   = evaluate in decimal arithmetic and return a Decimal, see pv()
 
         Acceptable Argument inputs:
-            r       : float. 1% should be entered as .01
+            r       : float. 1% should be entered as .01, a DiscountTable, or a YieldCurve
             r_is    : see rates docstring for description
             annuity_due: True or False
+            exact   : True, False, or integer >= 16
             all others: float or integer
     '''
 
     # Function Body
     #   if 'r_is' has been specified then determine its type, else it's assumed to
     #   be an interest rate 'i'
-    if r_is:
-        r_is = get_rType(str(r_is))
+    r_is = _rType(r_is)
+
+    #   exact mode evaluates the same formulas in decimal arithmetic
+    if exact:
+        with _exact_context(exact):
+            return _fv_exact(r,t,r_is,q,pv,q_per_t,annuity_due,future_cash,precision)
+
+    #   a yield curve accumulates each payment at the curve's forward rates
+    if isinstance(r,YieldCurve):
+        return _fv_curve(r,t,q,pv,q_per_t,annuity_due,future_cash,precision)
+
+    #   get the appropriate rates per payment period, from the table if given one
+    if isinstance(r,DiscountTable):
+        table = r
+        iRates = table.rates
+        q_per_t = table.q_per_t
     else:
-        r_is = 'i'
-
-    #   get the appropriate rates per payment period
+        table = False
+        iRates = _rates(r,r_is,q_per_t)
     if q_per_t:
-        iRates = rates(r=r,r_is=r_is,q_per_t=q_per_t)
         t = t * q_per_t
     else:
-        iRates = rates(r=r,r_is=r_is)
         q_per_t = 1
 
     #   assign 0 to all unused/uncalled arguments for math
@@ -433,35 +564,31 @@ def fv(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,fut
 
     #   cash-flow stream or traditional annuity stream
     if isinstance(q,list):
-        #   payments are a list - need to be calculated individually
-
-        #   reverse list so that normal loop can just iterate through without
-        #   needing to worry about finding the total range of the list
-        q.reverse()
-        pmts = []
-        t_list = 0
-        # accumulation starts immediately if annuity_due == True
+        #   payments are a list - accumulate them via accumulation factors. The
+        #   final payment accumulates for 0 periods, or 1 period if annuity_due == True,
+        #   so the payments are taken in reverse order
+        start = 0
         if annuity_due == True:
-            t_list = 1
-        # pmt loop
-        for i in q:
-            pmt = i * (1 + iRates['i'])**t_list
-            pmts.append(pmt)
-            t_list+=1
-        #   re-reverse the list to set back to original order
-        q.reverse()
+            start = 1
+        t_list = start + len(q) - 1
+        if table == False:
+            accum = _factors(1 + iRates.i,max(t_list,0))
+        elif len(table.accum) > t_list:
+            accum = table.accum
+        else:
+            raise ValueError('discount table is shorter than the cash flow stream')
 
-        futVal = sum(pmts)
+        futVal = float(np.dot(q[::-1],accum[start:t_list + 1]))
 
     else:
         #   payments are not a list - standard calculations apply
         #   calculate future value of annuity + pv + future cash
         if annuity_due == False:
-            futVal = q * ((1 + iRates['i'])**t - 1) / iRates['i']
+            futVal = q * ((1 + iRates.i)**t - 1) / iRates.i
         else:
-            futVal = q * ((1 + iRates['i'])**t - 1) / iRates['d']
+            futVal = q * ((1 + iRates.i)**t - 1) / iRates.d
 
-    futVal += pv * (1 + iRates['i'])**t
+    futVal += pv * (1 + iRates.i)**t
     futVal += future_cash
 
     #   round
@@ -473,167 +600,1970 @@ def fv(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,fut
 
     return futVal
 
-def solve_t(r,pv=False,r_is=False,q=False,q_per_t=False,fv=False,annuity_due=False,precision=False):
+def pv_stream(r,q,r_is=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,precision=False,chunk_size=65536):
     # docstring
     '''
         Function Description:
-            Solves for the number of periods of time 't' given an interest rate and at least
-            one of the following: present value (pv), future value (fv), or payments (q). If
-            pv is not given, pv defaults to 1. Function is not currently designed to handle
-            all three values (pv, fv, and q) at once, and will return an answer of 0.
-            Precision up to 16 decimal places (default is 10)
+            Returns Present Value (pv) of a cash flow stream q that is consumed incrementally,
+            so the stream never has to exist in memory as a whole. Equivalent to calling pv()
+            with q as a list, in constant memory. q may be any iterable or generator of payments,
+            an iterable of chunks (lists or NumPy arrays) of payments, or a NumPy array such as
+            a numpy.memmap of a file larger than memory, which is read chunk_size payments at
+            a time.
 
         Calculation assumptions:
-            Annuity payment are level and interest rates do not change
+            Interest rates do not change. As with pv(), payments must not skip periods.
 
         Variable/Argument Description:
-            r       = given interest rate
+            r       = given interest rate, or a DiscountTable (see discount_table())
+            q       = cash flow stream
             r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
-            q       = individual annuity payment amount
-            q_per_t = how many annuity payments per period t. Would be 12 if payments
+            q_per_t = how many payments per period of r. Would be 12 if payments
                     were Monthly but given rate 'r' is annual
-            pv      = present value
+            fv      = future value paid with the final payment
             annuity_due = True if annuity due, defaults to False
             cash_today  = any cash exchanging hands today
+            precision   = decimal places of answer, defaults to 2
+            chunk_size  = number of payments valued at a time
 
         Acceptable Argument inputs:
-            r       : float. 1% should be entered as .01
-            r_is    : see rates docstring for description
-            annuity_due: True or False
-            all others: float or integer
+            r           : float. 1% should be entered as .01
+            r_is        : see rates docstring for description
+            annuity_due : True or False
+            precision   : integer <= 16
+            q           : iterable of float/integers or of chunks of float/integers
+            chunk_size  : integer
+            all others  : float or integer
     '''
 
     # Function Body
-    #   if 'r_is' has been specified then determine its type, else it's assumed to
-    #   be an interest rate 'i'
-    if r_is:
-        r_is = get_rType(str(r_is))
-    else:
-        r_is = 'i'
-
     #   get the appropriate rates per payment period
-    if q_per_t:
-        iRates = rates(r=r,r_is=r_is,q_per_t=q_per_t)
+    if isinstance(r,DiscountTable):
+        iRates = r.rates
     else:
-        iRates = rates(r=r,r_is=r_is)
+        iRates = _rates(r,_rType(r_is),q_per_t)
 
-    # denominator
-    denominator = log(1 + iRates['i'])
+    #   assign 0 to all unused/uncalled arguments for math
+    if fv == False:
+        fv = 0
+    if cash_today == False:
+        cash_today = 0
 
-    # numerator
-    if pv == False:
-        pv = 1
-    if (q == False and fv == False) or (pv == fv):
-        numerator = denominator
-    elif q == False and fv != False:
-        numerator = log(fv / pv)
-    elif q != False and fv == False and annuity_due == False:
-        numerator = -log(1 - iRates['i'] * pv / q)
-    elif q != False and fv == False and annuity_due == True:
-        numerator = -log(1 - iRates['d'] * pv / q)
-    else:
-        numerator = 0
+    #   payments are made at t = 1..n, or t = 0..n-1 for an annuity due; vt carries
+    #   the discount factor from one chunk to the next
+    start = 1
+    if annuity_due == True:
+        start = 0
+    vt = iRates.v**start
+    presVal = 0.
+    n = 0
+    for chunk in _chunks(q,chunk_size):
+        v = vt * _factors(iRates.v,len(chunk))
+        presVal += float(np.dot(chunk,v[:-1]))
+        vt = v[-1]
+        n += len(chunk)
+
+    #   final step: fv is paid with the final payment
+    t = start + n - 1
+    presVal += fv * iRates.v**t
+    presVal += cash_today
 
     #   round
     if precision == False:
-        precision = 10
+        precision = 2
     precision = min(precision,16)
 
-    t = round(numerator / denominator, precision)
+    presVal = round(presVal,precision)
 
-    return t
+    return presVal
 
-def solve_q(r,t,r_is=False,pv=False,fv=False,q_per_t=False,annuity_due=False,sinking_fund=False,precision=False):
+def fv_stream(r,q,t=False,r_is=False,pv=False,q_per_t=False,annuity_due=False,future_cash=False,precision=False,chunk_size=65536):
     # docstring
     '''
-       Function Description:
-            Returns payment amount (q) given specified arguments.
-            Max precision is 10^-16
+        Function Description:
+            Returns Future Value (fv) of a cash flow stream q that is consumed incrementally,
+            so the stream never has to exist in memory as a whole. Equivalent to calling fv()
+            with q as a list, in constant memory: the value accumulated so far is rolled
+            forward over each chunk as it arrives. q may be anything pv_stream() accepts.
 
         Calculation assumptions:
-            Annuity payment are level and interest rates do not change.
-            If pv and fv are not specified then pv is set to 1.
-            If sinking_fund == True, payments q are accumulated, otherwise (by default)
-                payments are discounted.
+            Interest rates do not change. As with fv(), the stream is accumulated to the
+            time of the final payment (one period later for an annuity due).
 
         Variable/Argument Description:
-            r       = given interest rate
+            r       = given interest rate, or a DiscountTable (see discount_table())
+            q       = cash flow stream
+            t       = given time period over which pv accumulates. Usually years.
             r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
-            t       = given time period. Usually years.
-            q_per_t = how many annuity payments per period t. Would be 12 if payments
+            q_per_t = how many payments per period t. Would be 12 if payments
                     were Monthly but given rate 'r' is annual
             pv      = present value
-            fv      = future value
             annuity_due = True if annuity due, defaults to False
+            future_cash = any cash exchanging hands at the end
+            precision   = decimal places of answer, defaults to 2
+            chunk_size  = number of payments accumulated at a time
 
         Acceptable Argument inputs:
-            r       : float. 1% should be entered as .01
-            r_is    : see rates docstring for description
-            annuity_due: True or False
-            all others: float or integer
+            r           : float. 1% should be entered as .01
+            r_is        : see rates docstring for description
+            annuity_due : True or False
+            precision   : integer <= 16
+            q           : iterable of float/integers or of chunks of float/integers
+            chunk_size  : integer
+            all others  : float or integer
     '''
 
     # Function Body
-    #   if 'r_is' has been specified then determine its type, else it's assumed to
-    #   be an interest rate 'i'
-    if r_is:
-        r_is = get_rType(str(r_is))
-    else:
-        r_is = 'i'
-
     #   get the appropriate rates per payment period
-    if q_per_t:
-        iRates = rates(r=r,r_is=r_is,q_per_t=q_per_t)
-        t *= q_per_t
+    if isinstance(r,DiscountTable):
+        iRates = r.rates
+        q_per_t = r.q_per_t
     else:
-        iRates = rates(r=r,r_is=r_is)
-        q_per_t = 1
+        iRates = _rates(r,_rType(r_is),q_per_t)
+    if q_per_t:
+        t = t * q_per_t
 
-    #   account for annuity_due
-    if annuity_due == False:
-        r = iRates['i']
-    else:
-        r = iRates['d']
+    #   assign 0 to all unused/uncalled arguments for math
+    if pv == False:
+        pv = 0
+    if future_cash == False:
+        future_cash = 0
 
-    #   calculate the numerator
-    if fv == False and pv == False:
-        numerator = 1
-        precision = 16
-    elif sinking_fund == False and fv == False and pv:
-        numerator = pv
-    elif sinking_fund == False and fv != False and pv != False:
-        numerator = fv * iRates['v'] ** t - pv
-    elif sinking_fund == True and fv != False and pv == False:
-        numerator = fv
-    else:
-        numerator = fv - pv * (1 + iRates['i']) ** t
+    #   roll the accumulated value forward over each chunk, then add the chunk
+    #   accumulated to its final payment
+    futVal = 0.
+    for chunk in _chunks(q,chunk_size):
+        accum = _factors(1 + iRates.i,len(chunk))
+        futVal = futVal * accum[-1] + float(np.dot(chunk[::-1],accum[:-1]))
+    #   accumulation starts immediately if annuity_due == True
+    if annuity_due == True:
+        futVal *= 1 + iRates.i
+
+    futVal += pv * (1 + iRates.i)**t
+    futVal += future_cash
 
-    #   calculate the denominator
-    if sinking_fund == False:
-        denominator = (1 - iRates['v']**t) / r
-    else:
-        denominator = ((1 + iRates['i'])**t - 1) / r
+    #   round
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    futVal = round(futVal,precision)
+
+    return futVal
+
+def xpv(r,dates,q,r_is=False,start=False,precision=False,basis='ACT/365'):
+    # docstring
+    '''
+        Function Description:
+            Returns the present value (pv) at start of payments q made on the given dates,
+            like a spreadsheet XNPV. Dates are converted to year fractions in one vectorized
+            pass (see dates.date_array()), so the whole stream is valued in one dot product.
+            Precision up to 16 decimal places, default is 2.
+
+        Calculation assumptions:
+            r is an annual rate and interest rates do not change. Each payment is discounted
+            by v^t where t is its time in years from start by the day-count convention basis,
+            by default its actual number of days over 365. Payments before start are
+            accumulated to start the same way.
+
+        Variable/Argument Description:
+            r       = given annual interest rate
+            dates   = the date of each payment in q
+            q       = payments, in the order of dates
+            r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
+            start   = valuation date, defaults to the first of dates
+            precision = decimal places of answer, defaults to 2
+            basis   = day-count convention, see yearfrac() in dates.py
+
+        Acceptable Argument inputs:
+            r       : float. 1% should be entered as .01
+            r_is    : see rates docstring for description
+            dates   : list or array of dates, see date() in dates.py for acceptable inputs
+            q       : list or array of float/integers
+            start   : any single date date() accepts
+            precision : integer <= 16
+            basis   : '30/360', '30/360 US', '30E/360', 'ACT/360', 'ACT/365', 'ACT/ACT' or 0-4
+    '''
+
+    # Function Body
+    t = _year_fractions(dates,start,basis)
+    v = _rates(r,_rType(r_is),False).v
+    presVal = float(np.dot(np.asarray(q,dtype=float),v ** t))
 
     #   round
     if precision == False:
         precision = 2
     precision = min(precision,16)
+    presVal = round(presVal,precision)
 
-    pmt = round(numerator / denominator, precision)
+    return presVal
 
-    return pmt
+def xirr(dates,q,get=False,start=False,tol=1e-12,maxiter=50,basis='ACT/365'):
+    # docstring
+    '''
+        Function Description:
+            Solves for the annual interest rates [i,d,v,delta] at which payments q made on the
+            given dates have a present value of 0, like a spreadsheet XIRR. Use get to return a
+            specific rate, otherwise returns a dict of all four from rates().
 
-def get_rType(x):
-    # No docstring
-    # Internal library function. Cleans & determines what type of value is being passed
-    # as 'r'. I.e. users may pass i (interest rate), d (discount), v (discount rate), or
-    # delta (continuously compounding interest rate)
-    if x=='1' or x[0].lower()=='i':
-        x = 'i'
-    elif x=='4' or x[0:2].lower()=='de' or x[0].lower()=='c' or x[0].lower()=='f':
-        x = 'delta'
-    elif x=='2' or x[0].lower()=='d':
-        x = 'd'
-    elif x=='3' or x[0].lower()=='v':
-        x = 'v'
-    return x
+        Calculation assumptions:
+            Payments are discounted as in xpv(), by v^t with t in years from start by the
+            day-count convention basis (actual days over 365 by default).
+            The rate is found by Newton's method on v, seeded from the level-annuity
+            approximation. If Newton's method fails, the discount factors from v = 1e-6 to 1e6
+            are scanned for a sign change and the root nearest a 0% rate is refined by Brent's
+            method. Payments without both ins and outs return an error value (0), as solve_r().
+
+        Variable/argument Description:
+            dates   = the date of each payment in q
+            q       = payments, in the order of dates. Outs and ins have opposite signs.
+            get     = return one rate, either i, d, v, or delta. See rates().
+            start   = the date t = 0, defaults to the first of dates. Does not change the rate
+                    with the default basis.
+            basis   = day-count convention, see yearfrac() in dates.py
+            tol     = relative tolerance of the Newton step on v
+            maxiter = maximum number of Newton steps
+
+        Acceptable argument inputs:
+            dates   : list or array of dates, see date() in dates.py for acceptable inputs
+            q       : list or array of float/integers
+            get     : see rates docstring for description
+            start   : any single date date() accepts
+            maxiter : int
+            tol     : float
+            basis   : '30/360', '30/360 US', '30E/360', 'ACT/360', 'ACT/365', 'ACT/ACT' or 0-4
+    '''
+
+    # Function Body
+    t = _year_fractions(dates,start,basis)
+    q = np.asarray(q,dtype=float)
+
+    #   payments must have ins and outs, otherwise return the error value 0
+    if q.max() <= 0 or q.min() >= 0:
+        r = 0
+    else:
+        r = 1 / _xirr(t,q,tol,maxiter) - 1
+
+    r = rates(r=r,get=get)
+
+    return r
+
+def discount_table(r,n,r_is=False,q_per_t=False):
+    # docstring
+    '''
+        Function Description:
+            Returns a DiscountTable of the discount factors v**t and accumulation factors
+            (1+i)**t for t = 0..n periods, built once by cumulative products. A table may be
+            passed to pv() or fv() in place of r, in which case cash-flow streams (q as a list)
+            are valued with a single dot product against the table instead of a loop.
+
+        Calculation assumptions:
+            Interest rates do not change. The table's rates and q_per_t are used in place of
+            any r_is or q_per_t passed to pv() or fv().
+
+        Variable/Argument Description:
+            r       = given interest rate
+            n       = number of payment periods covered by the table
+            r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
+            q_per_t = how many payments per period of r. Would be 12 if payments
+                    were Monthly but given rate 'r' is annual
+
+        Acceptable Argument inputs:
+            r       : float. 1% should be entered as .01
+            n       : integer
+            r_is    : see rates docstring for description
+            q_per_t : float or integer
+    '''
+
+    # Function Body
+    iRates = _rates(r,_rType(r_is),q_per_t)
+
+    table = DiscountTable(iRates,q_per_t,_factors(iRates.v,n),_factors(1 + iRates.i,n))
+    return table
+
+def yield_curve(t,r,r_is=False,step=1/12):
+    # docstring
+    '''
+        Function Description:
+            Returns a YieldCurve from spot rates r at times (knots) t, which pv(), fv(), and
+            solve_q() accept in place of r. Spot rates are interpolated linearly between the
+            knots and held flat beyond the first and last knots. Log discount factors are
+            precomputed once on a grid of step years, so discounting many cash flows is a
+            single vectorized lookup (see discount_factors()).
+
+        Calculation assumptions:
+            The spot rate for time t discounts a payment at t by (1 + i)^-t. Payments that
+            fall on the grid (e.g. monthly payments on the default monthly grid) use the
+            interpolated spot rate exactly; other times interpolate the log discount factor
+            between grid points.
+
+        Variable/Argument Description:
+            t       = knot times, usually years, in increasing order
+            r       = spot rates at the knots
+            r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
+            step    = grid spacing, in the same units as t
+
+        Acceptable Argument inputs:
+            t & r   : lists or arrays of float/integers of equal length
+            r_is    : see rates docstring for description
+            step    : float
+    '''
+
+    # Function Body
+    t = np.asarray(t,dtype=float)
+    i = _rates_array(r,r_is=_rType(r_is))['i']
+
+    #   log discount factors of the interpolated spot rates on the grid
+    grid = np.arange(int(np.ceil(t[-1] / step)) + 1) * step
+    log_v = -grid * np.log1p(np.interp(grid,t,i))
+
+    curve = YieldCurve(t,i,step,log_v)
+    return curve
+
+def discount_factors(curve,t):
+    # docstring
+    '''
+        Returns the discount factors of YieldCurve curve at times t (scalar or array) from
+        the curve's precomputed grid. Beyond the last grid point the last spot rate holds,
+        and before time 0 (e.g. an fv paid one period before the first payment) the first.
+    '''
+    t = np.asarray(t,dtype=float)
+    end = (len(curve.log_v) - 1) * curve.step
+    log_v = np.interp(t,np.arange(len(curve.log_v)) * curve.step,curve.log_v)
+    log_v = np.where(t > end,-t * np.log1p(curve.i[-1]),log_v)
+    log_v = np.where(t < 0,-t * np.log1p(curve.i[0]),log_v)
+    return np.exp(log_v)
+
+def sensitivity(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,get=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Returns the present value of the same cash flows as pv() together with its interest
+            rate sensitivities, as a dict of form:
+                {'pv':pv,'duration':duration,'modified_duration':modified,'convexity':convexity,'dv01':dv01}
+            Value and the first and second derivatives are found analytically in one pass over
+            the cash flows - in closed form for level annuities - instead of by bumping the
+            rate, so they carry no rounding noise. Use get to return a single measure.
+
+        Calculation assumptions:
+            Sensitivities are to the annual effective interest rate i, whatever r_is is, with
+            payment times in years (payment period / q_per_t). Where P is the present value
+                duration            = Macaulay duration in years, -(1 + i) * (dP/di) / P
+                modified_duration   = -(dP/di) / P
+                convexity           = (d2P/di2) / P
+                dv01                = -(dP/di) / 10000, the gain in value if i falls 1 basis point
+            cash_today is part of P but does not depend on i. Only pv is rounded to precision.
+
+        Variable/Argument Description:
+            see pv(). get is one of 'pv', 'duration', 'modified_duration', 'convexity', 'dv01'
+
+        Acceptable Argument inputs:
+            see pv(). r must be a rate, not a DiscountTable or YieldCurve
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    if not t:
+        t = 1
+    iRates = _rates(r,r_is,q_per_t)
+    i = _rates(r,r_is,False).i
+    if q_per_t:
+        t = t * q_per_t
+    else:
+        q_per_t = 1
+
+    #   assign 0 to all unused/uncalled arguments for math, and return the pv of 1
+    #   to 16 places as pv() does
+    if fv == False and q == False:
+        fv = 1
+        precision = 16
+    if q == False:
+        q = 0
+    if fv == False:
+        fv = 0
+    if cash_today == False:
+        cash_today = 0
+
+    #   sums of the discounted payments weighted by 1, k, and k**2 in periods k
+    if isinstance(q,list):
+        start = 1
+        if annuity_due == True:
+            start = 0
+        t = start + len(q) - 1
+        k = np.arange(start,t + 1,dtype=float)
+        flows = np.asarray(q,dtype=float) * _factors(iRates.v,t)[start:]
+        sums = [float(flows.sum()),float(flows @ k),float(flows @ (k * k))]
+    else:
+        sums = [q * total for total in _annuity_sums(iRates.v,t,annuity_due)]
+
+    answer = _sensitivities(sums,fv,iRates.v**t,t,q_per_t,i,cash_today,precision)
+
+    if get:
+        answer = answer[get]
+
+    return answer
+
+def rate_paths(r,t,scenarios,q_per_t=False,mean=False,speed=.1,volatility=.01,seed=False,chunk_size=False):
+    # docstring
+    '''
+        Function Description:
+            Simulates interest rate paths for pv_monte_carlo() from the Vasicek short-rate model,
+            returning a (scenarios x periods) NumPy array where row s holds the rate in each of
+            the t * q_per_t periods of scenario s. With chunk_size, returns a generator of arrays
+            of at most chunk_size scenarios instead, so memory stays bounded; the paths are the
+            same as without chunking.
+
+        Calculation assumptions:
+            Starting from r, each period of length dt = 1 / q_per_t years the rate moves by
+                speed * (mean - rate) * dt + volatility * sqrt(dt) * z
+            where z is standard normal. Rates are annual and may go negative. The same seed
+            always gives the same paths.
+
+        Variable/Argument Description:
+            r           = the rate today
+            t           = years simulated
+            scenarios   = number of paths
+            q_per_t     = periods per year, defaults to 1
+            mean        = long-run rate the paths revert to, defaults to r
+            speed       = speed of mean reversion, per year
+            volatility  = annual volatility of the rate
+            seed        = seed of the random number generator, defaults to fresh randomness
+            chunk_size  = scenarios per array, if a generator of arrays is wanted
+
+        Acceptable Argument inputs:
+            r, mean, speed, volatility, q_per_t : float
+            t           : float or integer; t * q_per_t must be a whole number of periods
+            scenarios, seed, chunk_size : integer
+    '''
+
+    # Function Body
+    if q_per_t == False:
+        q_per_t = 1
+    if mean is False:
+        mean = r
+    if seed is False:
+        seed = None
+    periods = int(round(t * q_per_t))
+    dt = 1 / q_per_t
+
+    #   r_k - mean = (r_(k-1) - mean) * decay + shock_k, stepped for every scenario of
+    #   a chunk at once
+    decay = 1 - speed * dt
+    rng = np.random.default_rng(seed)
+
+    def chunk(size):
+        shocks = rng.standard_normal((size,periods)) * (volatility * dt**.5)
+        deviation = np.empty((periods,size))
+        previous = np.full(size,r - mean)
+        for k in range(periods):
+            previous = deviation[k] = previous * decay + shocks[:,k]
+        return mean + deviation.T
+
+    if chunk_size == False:
+        return chunk(scenarios)
+    return (chunk(min(chunk_size,scenarios - start)) for start in range(0,scenarios,chunk_size))
+
+def pv_monte_carlo(paths,q=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,precision=False,chunk_size=False):
+    # docstring
+    '''
+        Function Description:
+            Returns the distribution of the present value of the same cash flows over many
+            interest rate scenarios, as a dict of form:
+                {'pv':pv,'mean':mean,'std':std,'stderr':stderr,'min':min,'p5':p5,'median':median,
+                 'p95':p95,'max':max}
+            where pv is the array of present values, one per scenario, and the rest summarise
+            it (stderr is the standard error of the mean). Every scenario is valued at once:
+            path discount factors are the cumulative products of the per-period discount
+            factors.
+
+        Calculation assumptions:
+            Row s of paths holds the annual interest rate i in force in each period of scenario
+            s, so the discount factor of period k is the product of (1 + i)**(-1/q_per_t) over
+            periods 1..k. Payments q are made at the end of each period, or at the start of
+            each period if annuity_due == True, and fv at the end of the last period.
+
+        Variable/Argument Description:
+            paths       = rate paths, e.g. from rate_paths()
+            q           = individual payment amount OR a cash flow stream with one payment per
+                        period
+            fv          = future value paid at the end of the last period
+            q_per_t     = periods per year of the paths, defaults to 1
+            annuity_due = True if annuity due, defaults to False
+            cash_today  = any cash exchanging hands today
+            precision   = decimal places of each present value, defaults to 2
+            chunk_size  = scenarios valued at a time, to bound memory
+
+        Acceptable Argument inputs:
+            paths       : (scenarios x periods) array, or an iterable of such arrays (e.g. the
+                        generator rate_paths() returns with chunk_size)
+            q           : float/integer or list/array of float/integers
+            chunk_size  : integer
+            all others  : see pv()
+    '''
+
+    # Function Body
+    if q_per_t == False:
+        q_per_t = 1
+    if fv == False and q is False:
+        fv = 1
+        precision = 16
+    if q is False:
+        q = 0
+    if cash_today == False:
+        cash_today = 0
+
+    #   value arrays of paths a chunk of scenarios at a time
+    if isinstance(paths,np.ndarray) or (isinstance(paths,list) and not isinstance(paths[0],np.ndarray)):
+        table = np.atleast_2d(np.asarray(paths,dtype=float))
+        if chunk_size == False:
+            chunk_size = max(1,len(table))
+        paths = (table[start:start + chunk_size] for start in range(0,len(table),chunk_size))
+
+    values = []
+    for chunk in paths:
+        chunk = np.atleast_2d(np.asarray(chunk,dtype=float))
+        discount = np.cumprod((1 + chunk)**(-1 / q_per_t),axis=1)
+        payments = np.broadcast_to(np.asarray(q,dtype=float),chunk.shape[1:])
+        if annuity_due == True:
+            presVal = payments[0] + discount[:,:-1] @ payments[1:]
+        else:
+            presVal = discount @ payments
+        values.append(presVal + fv * discount[:,-1] + cash_today)
+    presVal = np.concatenate(values)
+
+    #   round
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+    presVal = np.round(presVal,precision)
+
+    low,median,high = np.percentile(presVal,[5,50,95])
+    answer = {
+        'pv':presVal,
+        'mean':float(presVal.mean()),
+        'std':float(presVal.std(ddof=1)) if len(presVal) > 1 else 0.,
+        'min':float(presVal.min()),
+        'p5':float(low),
+        'median':float(median),
+        'p95':float(high),
+        'max':float(presVal.max()),
+    }
+    answer['stderr'] = answer['std'] / len(presVal)**.5
+
+    return answer
+
+def solve_t(r,pv=False,r_is=False,q=False,q_per_t=False,fv=False,annuity_due=False,precision=False,exact=False):
+    # docstring
+    '''
+        Function Description:
+            Solves for the number of periods of time 't' given an interest rate and at least
+            one of the following: present value (pv), future value (fv), or payments (q). If
+            pv is not given, pv defaults to 1. Function is not currently designed to handle
+            all three values (pv, fv, and q) at once, and will return an answer of 0.
+            Precision up to 16 decimal places (default is 10)
+
+        Calculation assumptions:
+            Annuity payment are level and interest rates do not change
+
+        Variable/Argument Description:
+            r       = given interest rate
+            r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
+            q       = individual annuity payment amount
+            q_per_t = how many annuity payments per period t. Would be 12 if payments
+                    were Monthly but given rate 'r' is annual
+            pv      = present value
+            annuity_due = True if annuity due, defaults to False
+            cash_today  = any cash exchanging hands today
+            exact   = evaluate in decimal arithmetic and return a Decimal, see pv()
+
+        Acceptable Argument inputs:
+            r       : float. 1% should be entered as .01
+            r_is    : see rates docstring for description
+            annuity_due: True or False
+            exact   : True, False, or integer >= 16
+            all others: float or integer
+    '''
+
+    # Function Body
+    #   if 'r_is' has been specified then determine its type, else it's assumed to
+    #   be an interest rate 'i'
+    r_is = _rType(r_is)
+
+    #   exact mode evaluates the same formulas in decimal arithmetic
+    if exact:
+        with _exact_context(exact):
+            return _solve_t_exact(r,pv,r_is,q,q_per_t,fv,annuity_due,precision)
+
+    #   get the appropriate rates per payment period
+    if q_per_t:
+        iRates = _rates(r,r_is,q_per_t)
+    else:
+        iRates = _rates(r,r_is,False)
+
+    # denominator
+    denominator = log(1 + iRates.i)
+
+    # numerator
+    if pv == False:
+        pv = 1
+    if (q == False and fv == False) or (pv == fv):
+        numerator = denominator
+    elif q == False and fv != False:
+        numerator = log(fv / pv)
+    elif q != False and fv == False and annuity_due == False:
+        numerator = -log(1 - iRates.i * pv / q)
+    elif q != False and fv == False and annuity_due == True:
+        numerator = -log(1 - iRates.d * pv / q)
+    else:
+        numerator = 0
+
+    #   round
+    if precision == False:
+        precision = 10
+    precision = min(precision,16)
+
+    t = round(numerator / denominator, precision)
+
+    return t
+
+def solve_q(r,t,r_is=False,pv=False,fv=False,q_per_t=False,annuity_due=False,sinking_fund=False,precision=False,exact=False):
+    # docstring
+    '''
+       Function Description:
+            Returns payment amount (q) given specified arguments.
+            Max precision is 10^-16
+
+        Calculation assumptions:
+            Annuity payment are level and interest rates do not change.
+            If pv and fv are not specified then pv is set to 1.
+            If sinking_fund == True, payments q are accumulated, otherwise (by default)
+                payments are discounted.
+
+        Variable/Argument Description:
+            r       = given interest rate, or a YieldCurve (see yield_curve()) to discount
+                    each payment at its own spot rate
+            r_is    = optional, defaults to 'i'. "r is" either 'i','d','v','delta'
+            t       = given time period. Usually years.
+            q_per_t = how many annuity payments per period t. Would be 12 if payments
+                    were Monthly but given rate 'r' is annual
+            pv      = present value
+            fv      = future value
+            annuity_due = True if annuity due, defaults to False
+            exact   = evaluate in decimal arithmetic and return a Decimal, see pv()
+
+        Acceptable Argument inputs:
+            r       : float. 1% should be entered as .01
+            r_is    : see rates docstring for description
+            annuity_due: True or False
+            exact   : True, False, or integer >= 16
+            all others: float or integer
+    '''
+
+    # Function Body
+    #   if 'r_is' has been specified then determine its type, else it's assumed to
+    #   be an interest rate 'i'
+    r_is = _rType(r_is)
+
+    #   exact mode evaluates the same formulas in decimal arithmetic
+    if exact:
+        with _exact_context(exact):
+            return _solve_q_exact(r,t,r_is,pv,fv,q_per_t,annuity_due,sinking_fund,precision)
+
+    #   a yield curve discounts each payment at its own spot rate
+    if isinstance(r,YieldCurve):
+        return _solve_q_curve(r,t,pv,fv,q_per_t,annuity_due,sinking_fund,precision)
+
+    #   get the appropriate rates per payment period
+    if q_per_t:
+        iRates = _rates(r,r_is,q_per_t)
+        t *= q_per_t
+    else:
+        iRates = _rates(r,r_is,False)
+        q_per_t = 1
+
+    #   account for annuity_due
+    if annuity_due == False:
+        r = iRates.i
+    else:
+        r = iRates.d
+
+    #   calculate the numerator
+    if fv == False and pv == False:
+        numerator = 1
+        precision = 16
+    elif sinking_fund == False and fv == False and pv:
+        numerator = pv
+    elif sinking_fund == False and fv != False and pv != False:
+        numerator = fv * iRates.v ** t - pv
+    elif sinking_fund == True and fv != False and pv == False:
+        numerator = fv
+    else:
+        numerator = fv - pv * (1 + iRates.i) ** t
+
+    #   calculate the denominator
+    if sinking_fund == False:
+        denominator = (1 - iRates.v**t) / r
+    else:
+        denominator = ((1 + iRates.i)**t - 1) / r
+
+    #   round
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    pmt = round(numerator / denominator, precision)
+
+    return pmt
+
+def amortize(r,t,r_is=False,pv=False,fv=False,q_per_t=False,annuity_due=False,sinking_fund=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Returns the amortization schedule of the level payment solve_q() finds for the same
+            arguments, as a dict of NumPy arrays with one element per payment period:
+                {'period':period,'payment':payment,'interest':interest,'principal':principal,
+                 'balance':balance}
+            The payment is rounded to precision like solve_q(), so the final payment is
+            adjusted by the rounding residual to land the balance exactly on its target. All
+            amounts are rounded to precision.
+
+        Calculation assumptions:
+            Annuity payments are level and interest rates do not change.
+            For a loan (the default) pv is the amount borrowed and fv an optional balloon paid
+            one period after the final payment of an annuity-due, or with the final payment
+            otherwise. Interest is charged on the balance outstanding since the previous
+            payment, principal is the rest of the payment, and balance is what is outstanding
+            after the payment.
+            If sinking_fund == True the payments are deposits accumulating to fv from an
+            opening fund of pv: interest is interest earned, principal is the deposit, and
+            balance is the fund at the end of the period.
+            If pv and fv are not specified then pv is set to 1.
+
+        Variable/Argument Description:
+            see solve_q()
+
+        Acceptable Argument inputs:
+            r       : float. 1% should be entered as .01
+            r_is    : see rates docstring for description
+            annuity_due & sinking_fund: True or False
+            all others: float or integer
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    iRates = _rates(r,r_is,q_per_t)
+    if q_per_t:
+        n = int(round(t * q_per_t))
+    else:
+        n = int(round(t))
+
+    #   the level payment, with any balloon fv of a loan netted from the amount borrowed
+    payment,pv,fv,precision = _amortize_payment(r,t,r_is,pv,fv,q_per_t,annuity_due,sinking_fund,precision,iRates.v**n)
+
+    schedule = _schedule(np.array([iRates.i]),np.array([n]),np.array([pv]),np.array([fv]),np.array([payment]),
+                         np.array([annuity_due],dtype=bool),sinking_fund,precision)
+    schedule = {key:value[0] if value.ndim == 2 else value for key,value in schedule.items()}
+
+    return schedule
+
+def amortize_iter(r,t,r_is=False,pv=False,fv=False,q_per_t=False,annuity_due=False,sinking_fund=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Generator version of amortize(): yields the schedule one period at a time as
+            tuples of (period,payment,interest,principal,balance), in constant memory, for
+            very long terms. Each row is computed from the same closed-form balances as
+            amortize(), so values match amortize().
+
+        Variable/Argument Description:
+            see solve_q() and amortize()
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    iRates = _rates(r,r_is,q_per_t)
+    if q_per_t:
+        n = int(round(t * q_per_t))
+    else:
+        n = int(round(t))
+    i = iRates.i
+
+    payment,pv,fv,precision = _amortize_payment(r,t,r_is,pv,fv,q_per_t,annuity_due,sinking_fund,precision,iRates.v**n)
+
+    #   the balance the final payment lands on (see _schedule)
+    if sinking_fund == False and annuity_due == True:
+        target = fv / (1 + i)
+    else:
+        target = fv
+
+    #   a block of periods at a time, from the same closed-form balances as _schedule
+    #   (NumPy array powers included), so the rows round alike in constant memory
+    for first in range(1,n + 1,1024):
+        last = min(first + 1023,n)
+        k = np.arange(first - 1,last + 1)
+        powers = np.power(1 + i,np.arange(first - 2,last + 2))
+        g = powers[1:-1]
+        s = k.astype(float) if i == 0 else (g - 1) / i
+        if sinking_fund == True:
+            if annuity_due == True:
+                s = (k + 1.) if i == 0 else (powers[2:] - 1) / i
+                s = s - 1
+            balance = pv * g + payment * s
+            interest = i * (balance[:-1] + payment * annuity_due)
+            principal = np.full(len(interest),payment)
+        else:
+            opening = powers[:-2].copy() if annuity_due == True else g
+            if annuity_due == True and first == 1:
+                opening[0] = 1
+            balance = pv * opening - payment * s
+            interest = i * balance[:-1]
+            if annuity_due == True and first == 1:
+                interest[0] = 0.
+            principal = payment - interest
+        balance = balance[1:]
+        q = np.full(len(interest),payment)
+
+        #   the final payment absorbs the rounding residual of the level payment
+        if last == n:
+            if sinking_fund == True:
+                residual = (target - balance[-1]) / (1 + i)**annuity_due
+                interest[-1] += i * residual * annuity_due
+            else:
+                residual = balance[-1] - target
+            q[-1] += residual
+            principal[-1] += residual
+            balance[-1] = target
+
+        rows = np.round(np.column_stack([q,interest,principal,balance]),precision).tolist()
+        for period,row in zip(range(first,last + 1),rows):
+            yield (period,*row)
+
+def amortize_batch(r,t,r_is=False,pv=False,fv=False,q_per_t=False,annuity_due=False,sinking_fund=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Vectorized version of amortize() for many loans at once. Every numeric argument may
+            be a scalar or a NumPy array with one element per loan (annuity_due may be a mask).
+            Returns a dict with 'period' (1..longest term) and 2-D arrays of 'payment',
+            'interest', 'principal', and 'balance' with one row per loan, padded with nan past
+            the end of each loan's term. Row by row the schedules match amortize().
+
+        Variable/Argument Description:
+            see solve_q() and amortize(). r_is, sinking_fund and precision apply to the whole
+            batch.
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    t = np.asarray(t,dtype=float)
+    pv = np.asarray(pv,dtype=float)
+    fv = np.asarray(fv,dtype=float)
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    annuity_due = np.asarray(annuity_due,dtype=bool)
+    iRates = _rates_array(r,r_is=r_is,q_per_t=q_per_t)
+    n = np.rint(np.where(q_per_t == 0,t,t * q_per_t)).astype(int)
+    i,v,n,pv,fv,annuity_due = np.broadcast_arrays(iRates['i'],iRates['v'],n,pv,fv,annuity_due)
+
+    #   neither pv nor fv means a loan of 1, with its payment at full precision
+    unit = (pv == 0) & (fv == 0)
+    pv = np.where(unit,1,pv)
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    #   the level payments from solve_q_batch(), with any balloon fv of a loan netted
+    #   from the amount borrowed as amortize() does
+    if sinking_fund == True:
+        arguments = {'pv':pv,'fv':fv,'sinking_fund':True}
+    else:
+        arguments = {'pv':pv - fv * v**n}
+    payment = solve_q_batch(r,t,r_is=r_is,q_per_t=q_per_t,annuity_due=annuity_due,precision=precision,**arguments)
+    if unit.any():
+        payment = np.where(unit,solve_q_batch(r,t,r_is=r_is,q_per_t=q_per_t,annuity_due=annuity_due,precision=16,**arguments),payment)
+
+    schedule = _schedule(i.ravel(),n.ravel(),pv.ravel(),fv.ravel(),payment.ravel(),annuity_due.ravel(),sinking_fund,precision,unit.ravel())
+
+    return schedule
+
+def pv_batch(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Vectorized version of pv(). Every numeric argument may be a scalar or a NumPy
+            array; arguments are broadcast against each other and an array of present values
+            is returned. Element by element the answers match pv(), including its defaults:
+            t defaults to 1, and if neither q nor fv is given the pv of 1 is returned at
+            full (16 decimal place) precision.
+
+        Calculation assumptions:
+            Annuity payments are level/regular and interest rates do not change. Irregular
+            cash flow streams (q as a list) are not supported - use pv() for those.
+
+        Variable/Argument Description:
+            see pv(). annuity_due may be a boolean array (mask) flagging which elements are
+            annuities-due. r_is and precision apply to the whole batch.
+
+        Acceptable Argument inputs:
+            r_is        : see rates docstring for description
+            annuity_due : True, False, or array of booleans
+            precision   : integer <= 16
+            all others  : float/integer or array of float/integers
+    '''
+
+    # Function Body
+    #   if 'r_is' has been specified then determine its type, else it's assumed to
+    #   be an interest rate 'i'
+    r_is = _rType(r_is)
+
+    #   unused/uncalled arguments (False) become 0 for math
+    t = np.asarray(t,dtype=float)
+    q = np.asarray(q,dtype=float)
+    fv = np.asarray(fv,dtype=float)
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    annuity_due = np.asarray(annuity_due,dtype=bool)
+    cash_today = np.asarray(cash_today,dtype=float)
+
+    #   establish t and get the appropriate rates per payment period
+    t = np.where(t == 0,1,t)
+    iRates = _rates_array(r,r_is=r_is,q_per_t=q_per_t)
+    t = np.where(q_per_t == 0,t,t * q_per_t)
+
+    #   elements with neither q nor fv are the pv of 1, at full precision
+    unit = (q == 0) & (fv == 0)
+    fv = np.where(unit,1,fv)
+
+    #   present value of annuity + future value + cash today
+    with np.errstate(divide='ignore',invalid='ignore'):
+        vt = iRates['v']**t
+        presVal = q * (1 - vt) / np.where(annuity_due,iRates['d'],iRates['i'])
+    presVal = np.where(q == 0,0,presVal)
+    presVal = presVal + fv * vt + cash_today
+
+    #   round
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    presVal = np.where(unit,np.round(presVal,16),np.round(presVal,precision))
+
+    return presVal
+
+def fv_batch(r,t=False,r_is=False,q=False,pv=False,q_per_t=False,annuity_due=False,future_cash=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Vectorized version of fv(). Every numeric argument may be a scalar or a NumPy
+            array; arguments are broadcast against each other and an array of future values
+            is returned. Element by element the answers match fv(), including the fv of 1
+            returned at full (16 decimal place) precision when neither q nor pv is given.
+
+        Calculation assumptions:
+            Annuity payments are level/regular and interest rates do not change. Irregular
+            cash flow streams (q as a list) are not supported - use fv() for those.
+
+        Variable/Argument Description:
+            see fv(). annuity_due may be a boolean array (mask) flagging which elements are
+            annuities-due. r_is and precision apply to the whole batch.
+
+        Acceptable Argument inputs:
+            r_is        : see rates docstring for description
+            annuity_due : True, False, or array of booleans
+            precision   : integer <= 16
+            all others  : float/integer or array of float/integers
+    '''
+
+    # Function Body
+    #   if 'r_is' has been specified then determine its type, else it's assumed to
+    #   be an interest rate 'i'
+    r_is = _rType(r_is)
+
+    #   unused/uncalled arguments (False) become 0 for math
+    t = np.asarray(t,dtype=float)
+    q = np.asarray(q,dtype=float)
+    pv = np.asarray(pv,dtype=float)
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    annuity_due = np.asarray(annuity_due,dtype=bool)
+    future_cash = np.asarray(future_cash,dtype=float)
+
+    #   get the appropriate rates per payment period
+    iRates = _rates_array(r,r_is=r_is,q_per_t=q_per_t)
+    t = np.where(q_per_t == 0,t,t * q_per_t)
+
+    #   elements with neither q nor pv are the fv of 1, at full precision
+    unit = (q == 0) & (pv == 0)
+    pv = np.where(unit,1,pv)
+
+    #   future value of annuity + pv + future cash
+    with np.errstate(divide='ignore',invalid='ignore'):
+        accum = (1 + iRates['i'])**t
+        futVal = q * (accum - 1) / np.where(annuity_due,iRates['d'],iRates['i'])
+    futVal = np.where(q == 0,0,futVal)
+    futVal = futVal + pv * accum + future_cash
+
+    #   round
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    futVal = np.where(unit,np.round(futVal,16),np.round(futVal,precision))
+
+    return futVal
+
+def solve_t_batch(r,pv=False,r_is=False,q=False,q_per_t=False,fv=False,annuity_due=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Vectorized version of solve_t(). Every numeric argument may be a scalar or a NumPy
+            array; arguments are broadcast against each other and an array of periods is
+            returned. solve_t()'s choice of formula is made element by element with masks,
+            so each element matches solve_t() for the same arguments (with 0 standing for an
+            argument that is not given).
+
+        Variable/Argument Description:
+            see solve_t(). annuity_due may be a boolean array (mask). r_is and precision apply
+            to the whole batch.
+
+        Acceptable Argument inputs:
+            r_is        : see rates docstring for description
+            annuity_due : True, False, or array of booleans
+            precision   : integer <= 16
+            all others  : float/integer or array of float/integers
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    pv = np.asarray(pv,dtype=float)
+    q = np.asarray(q,dtype=float)
+    fv = np.asarray(fv,dtype=float)
+    annuity_due = np.asarray(annuity_due,dtype=bool)
+    iRates = _rates_array(r,r_is=r_is,q_per_t=q_per_t)
+
+    # denominator
+    denominator = np.log(1 + iRates['i'])
+
+    # numerator, selected by the same conditions as solve_t()
+    pv = np.where(pv == 0,1,pv)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        numerator = np.select(
+            [((q == 0) & (fv == 0)) | (pv == fv),
+             (q == 0) & (fv != 0),
+             (q != 0) & (fv == 0) & ~annuity_due,
+             (q != 0) & (fv == 0) & annuity_due],
+            [denominator,
+             np.log(fv / pv),
+             -np.log(1 - iRates['i'] * pv / q),
+             -np.log(1 - iRates['d'] * pv / q)],
+            0)
+        t = numerator / denominator
+
+    #   round
+    if precision == False:
+        precision = 10
+    precision = min(precision,16)
+
+    t = np.round(t,precision)
+
+    return t
+
+def solve_q_batch(r,t,r_is=False,pv=False,fv=False,q_per_t=False,annuity_due=False,sinking_fund=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Vectorized version of solve_q(). Every numeric argument may be a scalar or a NumPy
+            array; arguments are broadcast against each other and an array of payments is
+            returned. solve_q()'s choice of formula is made element by element with masks, so
+            each element matches solve_q() for the same arguments (with 0 standing for an
+            argument that is not given), including the payment for a pv of 1 returned at
+            full precision when neither pv nor fv is given.
+
+        Variable/Argument Description:
+            see solve_q(). annuity_due and sinking_fund may be boolean arrays (masks). r_is and
+            precision apply to the whole batch.
+
+        Acceptable Argument inputs:
+            r_is        : see rates docstring for description
+            annuity_due & sinking_fund : True, False, or array of booleans
+            precision   : integer <= 16
+            all others  : float/integer or array of float/integers
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    t = np.asarray(t,dtype=float)
+    pv = np.asarray(pv,dtype=float)
+    fv = np.asarray(fv,dtype=float)
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    annuity_due = np.asarray(annuity_due,dtype=bool)
+    sinking_fund = np.asarray(sinking_fund,dtype=bool)
+
+    #   get the appropriate rates per payment period
+    iRates = _rates_array(r,r_is=r_is,q_per_t=q_per_t)
+    t = np.where(q_per_t == 0,t,t * q_per_t)
+
+    #   account for annuity_due
+    r = np.where(annuity_due,iRates['d'],iRates['i'])
+
+    #   calculate the numerator, selected by the same conditions as solve_q()
+    vt = iRates['v']**t
+    accum = (1 + iRates['i'])**t
+    unit = (fv == 0) & (pv == 0)
+    numerator = np.select(
+        [unit,
+         ~sinking_fund & (fv == 0),
+         ~sinking_fund & (fv != 0) & (pv != 0),
+         sinking_fund & (fv != 0) & (pv == 0)],
+        [1,
+         pv,
+         fv * vt - pv,
+         fv],
+        fv - pv * accum)
+
+    #   calculate the denominator
+    with np.errstate(divide='ignore',invalid='ignore'):
+        denominator = np.where(sinking_fund,accum - 1,1 - vt) / r
+        pmt = numerator / denominator
+
+    #   round
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    pmt = np.where(unit,np.round(pmt,16),np.round(pmt,precision))
+
+    return pmt
+
+def sensitivity_batch(r,t=False,r_is=False,q=False,fv=False,q_per_t=False,annuity_due=False,cash_today=False,precision=False):
+    # docstring
+    '''
+        Function Description:
+            Vectorized version of sensitivity() for level annuities. Every numeric argument may
+            be a scalar or a NumPy array; arguments are broadcast against each other and a dict
+            of arrays is returned:
+                {'pv':pv,'duration':duration,'modified_duration':modified,'convexity':convexity,'dv01':dv01}
+            Element by element the answers match sensitivity().
+
+        Calculation assumptions:
+            see sensitivity(). Irregular cash flow streams (q as a list) are not supported - use
+            sensitivity() for those.
+
+        Variable/Argument Description:
+            see pv_batch()
+
+        Acceptable Argument inputs:
+            see pv_batch()
+    '''
+
+    # Function Body
+    r_is = _rType(r_is)
+    t = np.asarray(t,dtype=float)
+    q = np.asarray(q,dtype=float)
+    fv = np.asarray(fv,dtype=float)
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    annuity_due = np.asarray(annuity_due,dtype=bool)
+    cash_today = np.asarray(cash_today,dtype=float)
+
+    #   establish t and get the rates per payment period, and the annual rate
+    t = np.where(t == 0,1,t)
+    v = _rates_array(r,r_is=r_is,q_per_t=q_per_t)['v']
+    i = _rates_array(r,r_is=r_is)['i']
+    t = np.where(q_per_t == 0,t,t * q_per_t)
+    q_per_t = np.where(q_per_t == 0,1,q_per_t)
+
+    #   elements with neither q nor fv are the sensitivities of 1, with pv to 16 places
+    unit = (q == 0) & (fv == 0)
+    fv = np.where(unit,1,fv)
+
+    sums = [q * total for total in _annuity_sums(v,t,annuity_due)]
+    answer = _sensitivities(sums,fv,v**t,t,q_per_t,i,cash_today,16)
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+    answer['pv'] = np.where(unit,answer['pv'],np.round(answer['pv'],precision))
+
+    return answer
+
+def get_rType(x):
+    # No docstring
+    # Internal library function. Cleans & determines what type of value is being passed
+    # as 'r'. I.e. users may pass i (interest rate), d (discount), v (discount rate), or
+    # delta (continuously compounding interest rate)
+    if x=='1' or x[0].lower()=='i':
+        x = 'i'
+    elif x=='4' or x[0:2].lower()=='de' or x[0].lower()=='c' or x[0].lower()=='f':
+        x = 'delta'
+    elif x=='2' or x[0].lower()=='d':
+        x = 'd'
+    elif x=='3' or x[0].lower()=='v':
+        x = 'v'
+    return x
+
+def _rates_array(r,r_is='i',q_per_t=False):
+    # No docstring
+    # Internal library function. Array counterpart of rates(): returns the dict
+    # {'i','d','v','delta'} of NumPy arrays for array input r of type r_is (already
+    # cleaned by get_rType). Rounds to 10 decimal places exactly like rates(), and
+    # adjusts to q_per_t compounding wherever q_per_t is non-zero.
+    def interest(i):
+        d = i/(1+i)
+        return {'i':i,'d':d,'v':1-d,'delta':np.exp(i)-1}
+
+    r = np.asarray(r,dtype=float)
+    if r_is == 'i':
+        answer = interest(r)
+    elif r_is == 'd':
+        i = r/(1-r)
+        answer = {'i':i,'d':r,'v':1-r,'delta':np.exp(i)-1}
+    elif r_is == 'v':
+        i = 1/r - 1
+        answer = {'i':i,'d':1-r,'v':r,'delta':np.exp(i)-1}
+    else:
+        i = np.log(1+r)
+        d = i/(1+i)
+        answer = {'i':i,'d':d,'v':1-d,'delta':r}
+    answer = {key:np.round(value,10) for key,value in answer.items()}
+
+    #   rates adjusted for a different compounding period are recalculated as
+    #   interest rates, the same way rates() recurses
+    q_per_t = np.asarray(q_per_t,dtype=float)
+    if q_per_t.any():
+        adjust = q_per_t != 0
+        i = (1 + answer['i'])**(1 / np.where(adjust,q_per_t,1)) - 1
+        adjusted = interest(i)
+        answer = {key:np.where(adjust,np.round(adjusted[key],10),value) for key,value in answer.items()}
+
+    return answer
+
+def _irr(q,tol=1e-13,maxiter=50):
+    # No docstring
+    # Internal library function. Returns the largest real root x = 1 + i of the cash
+    # flow polynomial q[0]*x**n + q[1]*x**(n-1) + ... + q[n] (q[k] paid at time k), or
+    # 1 if it has no real roots - the same answer solve_r() takes from polyroots.
+    # Newton's method from the level-annuity seed finds a root, then the interval
+    # above it is scanned for sign changes so that the largest root is kept.
+    c = np.trim_zeros(np.asarray(q,dtype=float),'f')
+    n = len(c)
+    c = np.trim_zeros(c,'b')
+    # trailing zeros are roots at x = 0
+    floor = 0. if len(c) < n else None
+    if len(c) < 2:
+        return 1. if floor is None else floor
+
+    #   Newton iteration from the level-annuity approximation
+    root = _newton_kernel(c,1 + _irr_seed(c[np.newaxis,:])[0],tol,maxiter)
+    if root != root:
+        root = None
+
+    #   by Descartes' rule of signs a single sign change in the cash flows means a
+    #   single positive root, which is then the largest real root
+    signs = np.sign(c[c != 0])
+    if root is not None and root > 0 and np.count_nonzero(signs[1:] != signs[:-1]) == 1:
+        return float(root)
+
+    #   Cauchy's bound holds every root inside (-bound,bound); look for a larger
+    #   root than the one found (or any root at all if Newton failed)
+    bound = 1 + np.abs(c[1:]).max() / abs(c[0])
+    lower = -bound if root is None else root
+    while True:
+        above = _bracket_root(c,lower,bound)
+        if above is None:
+            break
+        root = lower = above
+
+    #   a root at x = 0 is larger than any negative root found
+    if root is None:
+        return 1. if floor is None else floor
+    if floor is not None:
+        root = max(root,floor)
+    return float(root)
+
+def _horner(c,x):
+    # No docstring
+    # Internal library function. Evaluates sum(c[k] * x**k) and its derivative by
+    # Horner's rule, where each c[k] may be an array of coefficients matching x.
+    value = np.zeros_like(x)
+    slope = np.zeros_like(x)
+    for coefficient in c[::-1]:
+        slope = slope * x + value
+        value = value * x + coefficient
+    return value,slope
+
+def _irr_seed(c,k=None):
+    # No docstring
+    # Internal library function. Level-annuity approximation of the rate for each row
+    # of the 2-D array of cash flows c (c[:,j] paid at time k[j], by default j): the
+    # inflows and outflows are treated as single payments at their value-weighted mean
+    # times, so (1+i)**(t_in - t_out) = inflows / outflows.
+    if k is None:
+        k = np.arange(c.shape[1],dtype=float)
+    inflow = np.maximum(c,0)
+    outflow = np.maximum(-c,0)
+    s_in = inflow.sum(axis=1)
+    s_out = outflow.sum(axis=1)
+    with np.errstate(divide='ignore',invalid='ignore',over='ignore'):
+        t_in = (inflow @ k) / s_in
+        t_out = (outflow @ k) / s_out
+        seed = (s_in / s_out) ** (1 / (t_in - t_out)) - 1
+    seed = np.where(np.isfinite(seed),seed,.1)
+    return np.clip(seed,-.99,10)
+
+def _bracket_root(c,lower,upper,points=129):
+    # No docstring
+    # Internal library function. Scans (lower,upper] for the highest sign change of
+    # the polynomial c and returns that root refined by _brent(), or None.
+    x = np.linspace(lower,upper,points)[1:]
+    x[0] += (x[1] - x[0]) * 1e-6
+    y = np.sign(np.polyval(c,x))
+    change = np.nonzero(y[:-1] * y[1:] < 0)[0]
+    if len(change) == 0:
+        return None
+    k = change[-1]
+    return _brent(lambda z: np.polyval(c,z),x[k],x[k+1])
+
+def _brent(f,a,b,tol=1e-15,maxiter=100):
+    # No docstring
+    # Internal library function. Brent's method: root of f bracketed by [a,b], using
+    # inverse quadratic interpolation and the secant method, falling back to bisection.
+    fa = f(a)
+    fb = f(b)
+    c,fc = b,fb
+    for _ in range(maxiter):
+        if (fb > 0) == (fc > 0):
+            c,fc = a,fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a,b,c = b,c,b
+            fa,fb,fc = fb,fc,fb
+        tol1 = 4.4e-16 * abs(b) + tol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol1 or fb == 0:
+            return b
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol1 * q),abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a,fa = b,fb
+        b += d if abs(d) > tol1 else (tol1 if m > 0 else -tol1)
+        fb = f(b)
+    return b
+
+@lru_cache(maxsize=None,typed=True)
+def _rType(x):
+    # No docstring
+    # Internal library function. Cached get_rType() for r_is/get arguments, where False
+    # (not given) means an interest rate 'i'. Resolves each distinct input only once; typed,
+    # since equal keys such as 2 and 2.0 or 1 and True can clean differently.
+    if not x:
+        return 'i'
+    return get_rType(str(x))
+
+@lru_cache(maxsize=4096,typed=True)
+def _rates(r,r_is,q_per_t):
+    # No docstring
+    # Internal library function. Core of rates(): returns the associated rates of r as
+    # a Rates tuple, rounded to 10 decimal places and adjusted to q_per_t compounding.
+    # r_is must already be cleaned by _rType(). Results are cached on (r,r_is,q_per_t), typed
+    # so that equal keys of different types, e.g. Decimal and float, are kept apart.
+    if r_is == 'i':
+        i = r
+        d = i/(1+i)
+        delta = exp(i)-1
+    elif r_is == 'd':
+        d = r
+        i = d/(1-d)
+        delta = exp(i)-1
+    elif r_is == 'v':
+        d = 1-r
+        i = 1/r - 1
+        delta = exp(i)-1
+    else:
+        delta = r
+        i = log(1+delta)
+        d = i/(1+i)
+    answer = Rates(round(i,10),round(d,10),round(1-d,10),round(delta,10))
+
+    #   rates adjusted for a different compounding period are recalculated as
+    #   interest rates
+    if q_per_t:
+        i = (1 + answer.i)**(1 / q_per_t) - 1
+        answer = _rates(i,'i',False)
+
+    return answer
+
+def _factors(x,n):
+    # No docstring
+    # Internal library function. Returns the array [1, x, x**2, ..., x**n] as a running
+    # product.
+    factors = np.full(n + 1,x)
+    factors[0] = 1
+    return np.cumprod(factors)
+
+def _chunks(q,size):
+    # No docstring
+    # Internal library function. Yields the payments of q as float arrays of at most
+    # size payments: arrays (including memory-mapped ones) are sliced, chunks within an
+    # iterable are sliced in turn, and single payments are buffered.
+    if isinstance(q,np.ndarray):
+        for k in range(0,len(q),size):
+            yield np.asarray(q[k:k + size],dtype=float)
+        return
+    buffer = []
+    for payment in q:
+        if isinstance(payment,(list,tuple,np.ndarray)):
+            if buffer:
+                yield np.array(buffer,dtype=float)
+                buffer = []
+            yield from _chunks(np.asarray(payment),size)
+        else:
+            buffer.append(payment)
+            if len(buffer) == size:
+                yield np.array(buffer,dtype=float)
+                buffer = []
+    if buffer:
+        yield np.array(buffer,dtype=float)
+
+def _amortize_payment(r,t,r_is,pv,fv,q_per_t,annuity_due,sinking_fund,precision,vn):
+    # No docstring
+    # Internal library function. Level payment of a schedule from solve_q(), where a
+    # loan's balloon fv (worth fv * vn today) is netted from the amount borrowed.
+    # Returns the payment with the opening balance, fv, and precision used.
+    if pv == False and fv == False:
+        pv = 1
+        precision = 16
+    if fv == False:
+        fv = 0
+    if pv == False:
+        pv = 0
+    if sinking_fund == True:
+        payment = solve_q(r,t,r_is=r_is,pv=pv,fv=fv,q_per_t=q_per_t,annuity_due=annuity_due,sinking_fund=True,precision=precision)
+    else:
+        payment = solve_q(r,t,r_is=r_is,pv=pv - fv * vn,q_per_t=q_per_t,annuity_due=annuity_due,precision=precision)
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+    return payment,pv,fv,precision
+
+def _schedule(i,n,pv,fv,payment,annuity_due,sinking_fund,precision,unit=False):
+    # No docstring
+    # Internal library function. Amortization schedules in closed form for arrays of
+    # loans (one element per loan), padded with nan past each loan's n periods. With
+    # g[k] = (1+i)**k and s[k] = (g[k] - 1) / i the balance after period k is
+    #   loan, annuity immediate:    pv * g[k]   - q * s[k]
+    #   loan, annuity-due:          pv * g[k-1] - q * s[k]          (pv at k = 0)
+    #   sinking fund, immediate:    pv * g[k]   + q * s[k]
+    #   sinking fund, annuity-due:  pv * g[k]   + q * (s[k+1] - 1)
+    # and the final payment absorbs the rounding residual of the level payment q. Rows
+    # flagged by unit (loans of 1) are rounded to 16 decimal places.
+    width = int(n.max()) if len(n) else 0
+    k = np.arange(width + 2)
+    i = i[:,np.newaxis]
+    due = annuity_due[:,np.newaxis]
+    q = payment[:,np.newaxis]
+    g = (1 + i)**k
+    with np.errstate(divide='ignore',invalid='ignore'):
+        s = np.where(i == 0,k,(g - 1) / i)
+
+    #   balances for k = 0..width
+    if sinking_fund == True:
+        balance = pv[:,np.newaxis] * g[:,:-1] + q * np.where(due,s[:,1:] - 1,s[:,:-1])
+        interest = i * (balance[:,:-1] + q * due)
+        principal = np.broadcast_to(q,interest.shape).copy()
+        target = fv
+    else:
+        opening = np.where(due,np.concatenate([np.ones_like(i),g[:,:-2]],axis=1),g[:,:-1])
+        balance = pv[:,np.newaxis] * opening - q * s[:,:-1]
+        interest = i * balance[:,:-1]
+        interest[:,0] = np.where(annuity_due,0,interest[:,0])
+        principal = q - interest
+        target = np.where(annuity_due,fv / (1 + i[:,0]),fv)
+    balance = balance[:,1:]
+    payment = np.broadcast_to(q,interest.shape).copy()
+
+    #   the final payment absorbs the rounding residual
+    rows = np.arange(len(n))
+    last = n - 1
+    final = balance[rows,last]
+    if sinking_fund == True:
+        residual = (target - final) / np.where(annuity_due,1 + i[:,0],1)
+        interest[rows,last] += i[:,0] * residual * annuity_due
+    else:
+        residual = final - target
+    payment[rows,last] += residual
+    principal[rows,last] += residual
+    balance[rows,last] = target
+
+    #   pad past the end of each term
+    past = k[1:-1] > n[:,np.newaxis]
+    schedule = {'period':k[1:-1]}
+    for key,value in (('payment',payment),('interest',interest),('principal',principal),('balance',balance)):
+        value = np.where(np.asarray(unit)[...,np.newaxis],np.round(value,16),np.round(value,precision))
+        value[past] = np.nan
+        schedule[key] = value
+
+    return schedule
+
+def _exact_context(exact):
+    # No docstring
+    # Internal library function. Decimal context for exact mode: exact is True (28
+    # significant digits, the decimal default) or the number of significant digits.
+    # 1 means yes, as elsewhere in the library; other counts must be at least 16, since
+    # fewer digits than a float carries would not be exact.
+    if exact is True or exact == 1:
+        exact = 28
+    if int(exact) < 16:
+        raise ValueError('exact must be True or a number of significant digits >= 16')
+    return localcontext(Context(prec=int(exact)))
+
+def _dec(x):
+    # No docstring
+    # Internal library function. Converts x to Decimal through its shortest repr, so that
+    # .05 is exactly 0.05 rather than the binary float nearest to it.
+    if isinstance(x,Decimal):
+        return x
+    return Decimal(str(x))
+
+def _rates_exact(r,r_is,q_per_t):
+    # No docstring
+    # Internal library function. Decimal counterpart of _rates(), evaluated in the
+    # current decimal context without rounding to 10 decimal places. r must be a
+    # plain rate.
+    if isinstance(r,(DiscountTable,YieldCurve)):
+        raise ValueError('exact mode needs a plain rate r, not a discount table or yield curve')
+    r = _dec(r)
+    if r_is == 'i':
+        i = r
+    elif r_is == 'd':
+        i = r/(1-r)
+    elif r_is == 'v':
+        i = 1/r - 1
+    else:
+        i = (1+r).ln()
+    if q_per_t:
+        i = (1 + i)**(1 / _dec(q_per_t)) - 1
+    d = i/(1+i)
+    if r_is == 'delta' and not q_per_t:
+        delta = r
+    else:
+        delta = i.exp()-1
+    return Rates(i,d,1-d,delta)
+
+def _pv_exact(r,t,r_is,q,fv,q_per_t,annuity_due,cash_today,precision):
+    # No docstring
+    # Internal library function. pv() in decimal arithmetic.
+    if not t:
+        t = 1
+    iRates = _rates_exact(r,r_is,q_per_t)
+    t = _dec(t)
+    if q_per_t:
+        t *= _dec(q_per_t)
+
+    #   neither fv nor q is the pv of 1, left unrounded
+    if fv == False and q == False:
+        fv = 1
+        precision = None
+    if fv == False:
+        fv = 0
+    if q == False:
+        q = 0
+    if cash_today == False:
+        cash_today = 0
+
+    if isinstance(q,list):
+        start = 1
+        if annuity_due == True:
+            start = 0
+        presVal = sum((_dec(payment) * iRates.v**k for k,payment in enumerate(q,start)),Decimal(0))
+        t = start + len(q) - 1
+    elif annuity_due == False:
+        presVal = _dec(q) * (1 - iRates.v**t) / iRates.i
+    else:
+        presVal = _dec(q) * (1 - iRates.v**t) / iRates.d
+
+    presVal += _dec(fv) * iRates.v**t
+    presVal += _dec(cash_today)
+
+    if precision is None:
+        return +presVal
+    if precision == False:
+        precision = 2
+    return round(presVal,precision)
+
+def _fv_exact(r,t,r_is,q,pv,q_per_t,annuity_due,future_cash,precision):
+    # No docstring
+    # Internal library function. fv() in decimal arithmetic.
+    iRates = _rates_exact(r,r_is,q_per_t)
+    t = _dec(t) if t else Decimal(0)
+    if q_per_t:
+        t *= _dec(q_per_t)
+
+    #   neither pv nor q is the fv of 1, left unrounded
+    if pv == False and q == False:
+        pv = 1
+        precision = None
+    if pv == False:
+        pv = 0
+    if q == False:
+        q = 0
+    if future_cash == False:
+        future_cash = 0
+
+    if isinstance(q,list):
+        start = 0
+        if annuity_due == True:
+            start = 1
+        futVal = sum((_dec(payment) * (1 + iRates.i)**k for k,payment in enumerate(reversed(q),start)),Decimal(0))
+    elif annuity_due == False:
+        futVal = _dec(q) * ((1 + iRates.i)**t - 1) / iRates.i
+    else:
+        futVal = _dec(q) * ((1 + iRates.i)**t - 1) / iRates.d
+
+    futVal += _dec(pv) * (1 + iRates.i)**t
+    futVal += _dec(future_cash)
+
+    if precision is None:
+        return +futVal
+    if precision == False:
+        precision = 2
+    return round(futVal,precision)
+
+def _solve_t_exact(r,pv,r_is,q,q_per_t,fv,annuity_due,precision):
+    # No docstring
+    # Internal library function. solve_t() in decimal arithmetic.
+    iRates = _rates_exact(r,r_is,q_per_t)
+    denominator = (1 + iRates.i).ln()
+
+    if pv == False:
+        pv = 1
+    if (q == False and fv == False) or (pv == fv):
+        numerator = denominator
+    elif q == False and fv != False:
+        numerator = (_dec(fv) / _dec(pv)).ln()
+    elif q != False and fv == False and annuity_due == False:
+        numerator = -(1 - iRates.i * _dec(pv) / _dec(q)).ln()
+    elif q != False and fv == False and annuity_due == True:
+        numerator = -(1 - iRates.d * _dec(pv) / _dec(q)).ln()
+    else:
+        numerator = Decimal(0)
+
+    if precision == False:
+        precision = 10
+    return round(numerator / denominator,precision)
+
+def _solve_q_exact(r,t,r_is,pv,fv,q_per_t,annuity_due,sinking_fund,precision):
+    # No docstring
+    # Internal library function. solve_q() in decimal arithmetic.
+    iRates = _rates_exact(r,r_is,q_per_t)
+    t = _dec(t)
+    if q_per_t:
+        t *= _dec(q_per_t)
+    pv_dec = _dec(pv) if pv else Decimal(0)
+    fv_dec = _dec(fv) if fv else Decimal(0)
+
+    if annuity_due == False:
+        rate = iRates.i
+    else:
+        rate = iRates.d
+
+    #   neither pv nor fv is the payment for a pv of 1, left unrounded
+    if fv == False and pv == False:
+        numerator = Decimal(1)
+        precision = None
+    elif sinking_fund == False and fv == False and pv:
+        numerator = pv_dec
+    elif sinking_fund == False and fv != False and pv != False:
+        numerator = fv_dec * iRates.v ** t - pv_dec
+    elif sinking_fund == True and fv != False and pv == False:
+        numerator = fv_dec
+    else:
+        numerator = fv_dec - pv_dec * (1 + iRates.i) ** t
+
+    if sinking_fund == False:
+        denominator = (1 - iRates.v**t) / rate
+    else:
+        denominator = ((1 + iRates.i)**t - 1) / rate
+
+    if precision is None:
+        return +(numerator / denominator)
+    if precision == False:
+        precision = 2
+    return round(numerator / denominator,precision)
+
+def _curve_times(n,q_per_t,annuity_due):
+    # No docstring
+    # Internal library function. Times, in periods of the curve, of n payments made
+    # q_per_t times per period: 1..n payment periods in, or 0..n-1 for an annuity due.
+    start = 1
+    if annuity_due == True:
+        start = 0
+    return (np.arange(n) + start) / (q_per_t or 1)
+
+def _pv_curve(curve,t,q,fv,q_per_t,annuity_due,cash_today,precision):
+    # No docstring
+    # Internal library function. pv() against a YieldCurve: payments are discounted at
+    # their own spot rates. As in pv(), fv is paid at t or with the final payment of a
+    # cash flow stream.
+    if not t:
+        t = 1
+    if fv == False and q == False:
+        fv = 1
+        precision = 16
+    if fv == False:
+        fv = 0
+    if cash_today == False:
+        cash_today = 0
+
+    if isinstance(q,list):
+        times = _curve_times(len(q),q_per_t,annuity_due)
+        presVal = float(np.dot(q,discount_factors(curve,times)))
+        #   fv is paid with the final payment, as in pv() (one period before the first
+        #   when there are none)
+        start = 1
+        if annuity_due == True:
+            start = 0
+        t = (start + len(q) - 1) / (q_per_t or 1)
+    elif q:
+        times = _curve_times(int(round(t * (q_per_t or 1))),q_per_t,annuity_due)
+        presVal = q * float(discount_factors(curve,times).sum())
+    else:
+        presVal = 0.
+
+    presVal += fv * float(discount_factors(curve,t))
+    presVal += cash_today
+
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+    return round(presVal,precision)
+
+def _fv_curve(curve,t,q,pv,q_per_t,annuity_due,future_cash,precision):
+    # No docstring
+    # Internal library function. fv() against a YieldCurve: payments accumulate to the
+    # end of the stream (t, or the final payment of a list, one period on for an annuity
+    # due) at the curve's forward rates, and pv accumulates over t.
+    if pv == False and q == False:
+        pv = 1
+        precision = 16
+    if pv == False:
+        pv = 0
+    if future_cash == False:
+        future_cash = 0
+
+    if isinstance(q,list):
+        n = len(q)
+    elif q:
+        n = int(round(t * (q_per_t or 1)))
+    else:
+        n = 0
+    if n:
+        times = _curve_times(n,q_per_t,annuity_due)
+        end = n / (q_per_t or 1)
+        futVal = float(np.dot(np.broadcast_to(q,(n,)),discount_factors(curve,times))) / float(discount_factors(curve,end))
+    else:
+        futVal = 0.
+
+    futVal += pv / float(discount_factors(curve,t or 0))
+    futVal += future_cash
+
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+    return round(futVal,precision)
+
+def _solve_q_curve(curve,t,pv,fv,q_per_t,annuity_due,sinking_fund,precision):
+    # No docstring
+    # Internal library function. solve_q() against a YieldCurve, with the same choice of
+    # numerator as solve_q() and annuity factors summed from the curve's discount factors.
+    times = _curve_times(int(round(t * (q_per_t or 1))),q_per_t,annuity_due)
+    vt = float(discount_factors(curve,t))
+
+    if fv == False and pv == False:
+        numerator = 1
+        precision = 16
+    elif sinking_fund == False and fv == False and pv:
+        numerator = pv
+    elif sinking_fund == False and fv != False and pv != False:
+        numerator = fv * vt - pv
+    elif sinking_fund == True and fv != False and pv == False:
+        numerator = fv
+    else:
+        numerator = fv - pv / vt
+
+    denominator = float(discount_factors(curve,times).sum())
+    if sinking_fund == True:
+        denominator /= vt
+
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+    return round(numerator / denominator,precision)
+
+def _year_fractions(dates,start=False,basis='ACT/365'):
+    # No docstring
+    # Internal library function. Years from start (default the first date) to each of
+    # dates by day-count convention basis, computed in one pass over datetime64 days.
+    days = date_array(dates)
+    if start == False:
+        start = days[0]
+    else:
+        start = date_array([start])[0]
+    return yearfrac(start,days,basis)
+
+def _xirr(t,q,tol=1e-12,maxiter=50):
+    # No docstring
+    # Internal library function. Discount factor v solving sum(q * v**t) = 0 for
+    # payments q at times t: Newton's method from the level-annuity seed, then a
+    # geometric scan for a sign change refined by _brent(), choosing the root nearest
+    # v = 1. Returns nan if there is no root in the scanned range.
+    v = 1 / (1 + _irr_seed(q[np.newaxis,:],t)[0])
+    for _ in range(maxiter):
+        with np.errstate(divide='ignore',invalid='ignore',over='ignore'):
+            vt = v ** t
+            step = (q @ vt) / ((q * t) @ (vt / v))
+        if not np.isfinite(step) or v - step <= 0:
+            break
+        v -= step
+        if abs(step) <= tol * max(1,v):
+            return float(v)
+
+    #   Newton failed: bracket a root between discount factors of 1e-6 and 1e6
+    x = np.geomspace(1e-6,1e6,481)
+    with np.errstate(over='ignore',invalid='ignore'):
+        y = np.sign(np.power.outer(x,t) @ q)
+    change = np.nonzero(y[:-1] * y[1:] < 0)[0]
+    if len(change) == 0:
+        return np.nan
+    k = change[np.argmin(np.abs(np.log(x[change])))]
+    return _brent(lambda z: float(q @ z ** t),x[k],x[k+1],tol=tol * x[k])
+
+def _annuity_sums(v,n,annuity_due):
+    # No docstring
+    # Internal library function. Closed forms of sum(v**k), sum(k * v**k), and
+    # sum(k**2 * v**k) over the payment periods k = 1..n (k = 0..n-1 for an annuity
+    # due), for scalars or arrays, with the limits at v = 1.
+    if isinstance(v,float) and isinstance(n,(int,float)):
+        vn = v**n
+        if v == 1:
+            sums = [n,n * (n + 1) / 2,n * (n + 1) * (2 * n + 1) / 6]
+        else:
+            w = 1 - v
+            sums = [v * (1 - vn) / w,
+                    v * (1 - (n + 1) * vn + n * vn * v) / w**2,
+                    v * (1 + v - (n + 1)**2 * vn + (2 * n * n + 2 * n - 1) * vn * v - n * n * vn * v * v) / w**3]
+        if annuity_due == True:
+            sums = [sums[0] - vn + 1,sums[1] - n * vn,sums[2] - n * n * vn]
+        return sums
+
+    v = np.asarray(v,dtype=float)
+    n = np.asarray(n,dtype=float)
+    vn = v**n
+    one = v == 1
+    w = np.where(one,0.,1 - v)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        s0 = np.where(one,n,v * (1 - vn) / w)
+        s1 = np.where(one,n * (n + 1) / 2,v * (1 - (n + 1) * vn + n * vn * v) / w**2)
+        s2 = np.where(one,n * (n + 1) * (2 * n + 1) / 6,
+                      v * (1 + v - (n + 1)**2 * vn + (2 * n * n + 2 * n - 1) * vn * v - n * n * vn * v * v) / w**3)
+    #   an annuity due moves every payment one period earlier: drop period n, add period 0
+    due = np.asarray(annuity_due,dtype=bool)
+    s0 = np.where(due,s0 - vn + 1,s0)
+    s1 = np.where(due,s1 - n * vn,s1)
+    s2 = np.where(due,s2 - n * n * vn,s2)
+    return s0,s1,s2
+
+def _sensitivities(sums,fv,vt,t,q_per_t,i,cash_today,precision):
+    # No docstring
+    # Internal library function. Present value and its derivatives in the annual rate
+    # i from the discounted payment sums [sum(q v^k), sum(k q v^k), sum(k^2 q v^k)] in
+    # periods k, plus fv paid at period t. With times k / q_per_t in years,
+    # dP/di = -sum(time * q * v^k) / (1 + i) and
+    # d2P/di2 = sum(time * (time + 1) * q * v^k) / (1 + i)**2.
+    s0,s1,s2 = sums
+    years = t / q_per_t
+    value = s0 + fv * vt
+    first = -(s1 / q_per_t + fv * vt * years) / (1 + i)
+    second = (s2 / q_per_t**2 + s1 / q_per_t + fv * vt * years * (years + 1)) / (1 + i)**2
+    presVal = value + cash_today
+
+    if precision == False:
+        precision = 2
+    precision = min(precision,16)
+
+    #   scalars are answered in float arithmetic
+    if isinstance(presVal,float):
+        if presVal == 0:
+            presVal = np.float64(0)
+        answer = {
+            'pv':round(presVal,precision),
+            'duration':-(1 + i) * first / presVal,
+            'modified_duration':-first / presVal,
+            'convexity':second / presVal,
+            'dv01':-first / 10000,
+        }
+        return answer
+
+    with np.errstate(divide='ignore',invalid='ignore'):
+        answer = {
+            'pv':np.round(presVal,precision),
+            'duration':-(1 + i) * first / presVal,
+            'modified_duration':-first / presVal,
+            'convexity':second / presVal,
+            'dv01':-first / 10000,
+        }
+    return answer
+
+def _newton_powers(c,x,tol,maxiter):
+    # No docstring
+    # Internal library function. Newton's method for a root of the polynomial c (highest
+    # power first) from x, evaluating c and its derivative as dot products with the
+    # powers of x. Returns nan if it does not converge. The python backend's kernel.
+    powers = np.arange(len(c) - 1,-1,-1,dtype=float)
+    dc = c[:-1] * powers[:-1]
+    for _ in range(maxiter):
+        with np.errstate(over='ignore',invalid='ignore'):
+            xp = x ** powers
+            slope = dc @ xp[1:]
+        if slope == 0 or not np.isfinite(slope):
+            break
+        step = (c @ xp) / slope
+        x -= step
+        if abs(step) <= tol * max(1,abs(x)):
+            return float(x)
+    return np.nan
+
+def _newton_horner(c,x,tol,maxiter):
+    # No docstring
+    # Internal library function. _newton_powers() as an explicit loop, evaluating c and
+    # its derivative by Horner's rule in one pass. The numba backend's kernel.
+    for _ in range(maxiter):
+        value = 0.
+        slope = 0.
+        for coefficient in c:
+            slope = slope * x + value
+            value = value * x + coefficient
+        if slope == 0 or not isfinite(slope):
+            break
+        step = value / slope
+        x -= step
+        if abs(step) <= tol * max(1.,abs(x)):
+            return x
+    return np.nan
+
+#   the kernels of the selected backend
+_newton_kernel = _newton_powers
+if BACKEND == 'numba':
+    _newton_kernel = numba.njit(cache=True)(_newton_horner)
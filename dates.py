@@ -2,23 +2,81 @@
 '''
     Contains the following date functions:
     date()      - returns system date and creates dates from inputs
+    date_array() - converts many dates at once to a NumPy datetime64 array
+    set_date_cache() - sizes (or disables) the cache of dates parsed by date()
+    date_cache_info() - hits, misses, and size of the date() parse cache
+    date_cache_clear() - empties the date() parse cache
     datedif()   - returns numeric differences between dates
+    datedif_array() - vectorized datedif() over arrays of dates
+    yearfrac()  - year fractions between dates by day-count convention (30/360, ACT/365, ...)
     year()      - returns today's year or year of input date
     month()     - returns today's month or month of input date
     day()       - returns today's day of month or day of input date
     julian()    - returns the julian date of today or the given date
-    weekNum()   - returns the week number of today or the given date
+    julian_array() - day of the year of arrays of dates
+    weekNum()   - returns the ISO week number of today or the given date
+    weekNum_array() - ISO week number of arrays of dates
     dateMath()  - adds years, months, weeks, and days to today or given date
+    dateMath_array() - vectorized dateMath() over arrays of dates
     eoMonth()   - returns the end of the month
+    eoMonth_array() - vectorized eoMonth() over arrays of dates
+    schedule()  - lazily generates recurring (payment) dates
+    schedule_array() - recurring (payment) dates as a NumPy datetime64 array
+    holiday_calendar() - business-day calendar compiled from holiday rules (e.g. US_FEDERAL)
+    is_busday() - whether dates are business days
+    busday_count() - business days between dates
+    busday_add() - adds business days to dates
+    busday_adjust() - moves dates to business days (following, modified following, ...)
 '''
 
 # needed other libraries
-from dateutil import relativedelta
-from numpy import nan
-from math import floor
-import dateutil.parser
+from functools import lru_cache
+from collections import namedtuple
+import calendar
 import datetime
+import importlib.util
+import sys
 
+def _lazy_import(name):
+    # No docstring
+    # Internal library function. Returns module name, which is only loaded (executed)
+    # when one of its attributes is first used, keeping heavy libraries out of import.
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+#   numpy and dateutil load on first use
+np = _lazy_import('numpy')
+relativedelta = _lazy_import('dateutil.relativedelta')
+parser = _lazy_import('dateutil.parser')
+
+# Types
+#   a holiday, either a fixed date (month & day), the nth weekday of a month (month,
+#   weekday 0 = Monday, n with -1 the last), or days from Easter Sunday (easter). Fixed
+#   dates falling on a Saturday/Sunday are observed on the Friday/Monday if observed.
+HolidayRule = namedtuple('HolidayRule',['name','month','day','weekday','n','easter','observed','first_year'],
+                         defaults=(None,None,None,None,None,True,None))
+
+#   United States federal holidays
+US_FEDERAL = (
+    HolidayRule("New Year's Day",1,1),
+    HolidayRule('Martin Luther King Jr. Day',1,weekday=0,n=3),
+    HolidayRule("Washington's Birthday",2,weekday=0,n=3),
+    HolidayRule('Memorial Day',5,weekday=0,n=-1),
+    HolidayRule('Juneteenth',6,19,first_year=2021),
+    HolidayRule('Independence Day',7,4),
+    HolidayRule('Labor Day',9,weekday=0,n=1),
+    HolidayRule('Columbus Day',10,weekday=0,n=2),
+    HolidayRule('Veterans Day',11,11),
+    HolidayRule('Thanksgiving Day',11,weekday=3,n=4),
+    HolidayRule('Christmas Day',12,25),
+)
 
 # Functions
 def date(date1=False,month=False,day=False):
@@ -38,22 +96,85 @@ def date(date1=False,month=False,day=False):
                 MM or 'MM' - no other acceptable inputs ()
             Day:
                 DD or 'DD' - no other acceptable inputs
+
+        Single dates (date1 only) are parsed once and then served from a bounded LRU cache,
+        see set_date_cache(). datetimes are returned as they are.
     '''
     # function
     if date1 == False:
         date = datetime.datetime.now()
-    elif date1 is None or date1 is 0 or date1 is '' or date1 is nan or date1 is 'nan' or date1 is '':
+    elif isinstance(date1,datetime.datetime) and month == False and day == False:
+        date = date1
+    elif date1 is None or date1 == '' or date1 != date1 or date1 == 'nan':
         date = ''
-    elif len(str(date1)) > 4 and month == False and day == False:
-        date = dateutil.parser.parse(str(date1))
-    elif len(str(date1)) == 4 and month == False and day == False:
-        date = datetime.datetime(int(date1),1,1)
+    elif len(str(date1)) >= 4 and month == False and day == False:
+        date = _cached_parse(str(date1))
     elif month != False and day == False:
         date = datetime.datetime(int(date1),int(month),1)
     else:
         date = datetime.datetime(int(date1),int(month),int(day))
     return date
 
+def set_date_cache(maxsize=4096):
+    # docstring
+    '''
+        Replaces the cache of single dates parsed by date() with an empty one holding up
+        to maxsize dates (least recently used are dropped first). maxsize = 0 disables the
+        cache and None lets it grow without bound. The default holds 4096 dates.
+    '''
+    global _cached_parse
+    _cached_parse = lru_cache(maxsize=maxsize)(_parse)
+
+def date_cache_info():
+    # docstring
+    '''
+        Returns the hits, misses, maxsize, and currsize of the date() parse cache, as
+        functools.lru_cache reports them.
+    '''
+    return _cached_parse.cache_info()
+
+def date_cache_clear():
+    # docstring
+    'Empties the date() parse cache and resets its hit/miss counters'
+    _cached_parse.cache_clear()
+
+def date_array(dates):
+    # docstring
+    '''
+        Returns dates as a NumPy datetime64[D] array for vectorized date arithmetic, i.e.
+        day counts between many dates in one subtraction. Accepts a list or array of
+        anything date() accepts, with the same answers as date().
+
+        Strings and integers in the fixed formats YYYYMMDD, YYYYMM, YYYY, MM/DD/YYYY,
+        and YYYY-MM-DD are converted in bulk with array arithmetic. Only the irregular
+        leftovers are parsed by date() (dateutil), and every distinct value is
+        converted once however often it repeats. Blank dates (see date()) become NaT,
+        and datetime64 input is returned as days.
+    '''
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype,np.datetime64):
+        return dates.astype('datetime64[D]')
+    shape = dates.shape
+    dates = dates.ravel()
+
+    #   strings and integers: convert the distinct values, fixed formats in bulk
+    if dates.dtype.kind in 'iuUS':
+        unique,inverse = np.unique(dates,return_inverse=True)
+        days = _parse_fixed(unique)
+        for k in np.nonzero(np.isnat(days))[0]:
+            days[k] = _date64(unique[k].item())
+        return days[inverse].reshape(shape)
+
+    #   anything else: parse each distinct value once
+    parsed = {}
+    values = dates.tolist()
+    for value in values:
+        if value not in parsed:
+            parsed[value] = _date64(value)
+
+    answer = np.array([parsed[value] for value in values],dtype='datetime64[D]')
+    return answer.reshape(shape)
+
 def datedif(compare,today=False,period='m',exact=False):
     # docstring
     '''
@@ -143,22 +264,10 @@ def datedif(compare,today=False,period='m',exact=False):
         today = date(today)
     if type(compare) != datetime.datetime:
         compare = date(compare)
-    period = str(period)
 
-    # determine period
-    if((period[0].lower()=='m') or (period=='2') or (period=='12')):
-        period='m'
-    elif((period=='1') or (period[0].lower()=='y') or (period[0].lower()=='a')):
-        period='y'
-    elif((period=='3') or (period=='52') or (period[0].lower()=='w')):
-        period='w'
-    else:
-        period='d'
-    # if exact is not default, it's probably True
-    if (exact==False or str(exact)[0]=='0' or str(exact)[0]=='n'):
-        exact=False
-    else:
-        exact=True
+    # determine period, and if exact is not default, it's probably True
+    period = _period(period)
+    exact = _exact(exact)
 
     # call the correct sub-function
     if period == 'm' and exact == False:
@@ -179,6 +288,158 @@ def datedif(compare,today=False,period='m',exact=False):
     difference = abs(difference)
     return difference
 
+def datedif_array(compare,today=False,period='m',exact=False):
+    # docstring
+    '''
+        Vectorized datedif(): returns the absolute elapsed periods between arrays of dates
+        as a NumPy array, element by element the same as datedif() - including its month
+        and year counting (whole months as dateutil's relativedelta counts them, with
+        month-end clamping) and its exact months and years. Differences are computed
+        with integer year/month/day arithmetic over datetime64 days, so no date objects
+        are built per element.
+
+        Acceptable inputs:
+            compare & today
+                arrays/lists of dates (anything date_array() accepts), or single dates,
+                broadcast against each other. today defaults to today's date.
+            period & exact
+                see datedif()
+
+        Returns integers, or floats for exact months, years, and weeks. Where either date
+        is blank (NaT) the answer is nan, and the array is float.
+    '''
+    compare = date_array(compare)
+    if today is False:
+        today = np.datetime64(datetime.date.today(),'D')
+    today = date_array(today)
+    today,compare = np.broadcast_arrays(today,compare)
+    period = _period(period)
+    exact = _exact(exact)
+
+    #   signed days between the dates, and the months since the epoch of each
+    days = (today - compare).astype(np.int64)
+    month_today = today.astype('datetime64[M]')
+    month_compare = compare.astype('datetime64[M]')
+
+    if period == 'd':
+        difference = days
+    elif period == 'w' and exact == False:
+        difference = days // 7
+    elif period == 'w':
+        difference = days / 7
+    elif exact == False:
+        #   whole months: compare plus the calendar months between them, stepped back
+        #   one month if that overshoots today (as relativedelta counts them)
+        months = (month_today - month_compare).astype(np.int64)
+        shifted = _add_months64(compare,months)
+        months = months - ((today >= compare) & (shifted > today)) + ((today < compare) & (shifted < today))
+        if period == 'm':
+            difference = months
+        else:
+            difference = np.abs(months) // 12
+    elif period == 'm':
+        #   within a month, days over the length of the previous month (as datedif()
+        #   does); otherwise days scaled by the months per day between month starts
+        first_today = month_today.astype('datetime64[D]')
+        first_compare = month_compare.astype('datetime64[D]')
+        previous = (first_today - (month_today - 1).astype('datetime64[D]')).astype(np.int64)
+        months = (month_today - month_compare).astype(np.int64)
+        start_days = (first_today - first_compare).astype(np.int64)
+        same = months == 0
+        with np.errstate(divide='ignore',invalid='ignore'):
+            difference = np.where(same,days / previous,days * months / np.where(same,1,start_days))
+    else:
+        #   within a year, the difference of the fractions of the year elapsed; otherwise
+        #   days scaled by the years per day between year starts
+        year_today = today.astype('datetime64[Y]')
+        year_compare = compare.astype('datetime64[Y]')
+        jan_today = year_today.astype('datetime64[D]')
+        jan_compare = year_compare.astype('datetime64[D]')
+        length_today = ((year_today + 1).astype('datetime64[D]') - jan_today).astype(np.int64)
+        length_compare = ((year_compare + 1).astype('datetime64[D]') - jan_compare).astype(np.int64)
+        years = (year_today - year_compare).astype(np.int64)
+        start_days = (jan_today - jan_compare).astype(np.int64)
+        same = years == 0
+        fractions = (today - jan_today).astype(np.int64) / length_today - (compare - jan_compare).astype(np.int64) / length_compare
+        with np.errstate(divide='ignore',invalid='ignore'):
+            difference = np.where(same,fractions,days * years / np.where(same,1,start_days))
+
+    # take the absolute value of the answer - no negative differences allowed
+    difference = np.abs(difference)
+    blank = np.isnat(today) | np.isnat(compare)
+    if blank.any():
+        difference = np.where(blank,np.nan,difference)
+    return difference
+
+def yearfrac(start,end=False,basis='ACT/365'):
+    # docstring
+    '''
+        Returns the fraction of a year from start to end by the day-count convention basis,
+        for arrays of dates (or single dates) at once - e.g. accrual periods, or times t to
+        pass to business.py. Negative where end is before start.
+
+        Conventions (basis):
+            '30/360'        - 30/360 bond basis (ISDA): a 31st start day counts as the 30th,
+                            and a 31st end day as the 30th when the start day is the 30th/31st
+            '30/360 US' or 0 - US (NASD) 30/360: the bond basis, plus a start on the last day
+                            of February counts as the 30th, and so does an end on the last
+                            day of February when the start is too
+            '30E/360' or 4  - Eurobond basis: every 31st counts as the 30th
+            'ACT/360' or 2  - actual days / 360
+            'ACT/365' or 3  - actual days / 365 (fixed)
+            'ACT/ACT' or 1  - ISDA actual/actual: days in leap years / 366 plus days in other
+                            years / 365
+        The numbers are the spreadsheet YEARFRAC basis codes, though basis 1 here is the
+        ISDA convention rather than the spreadsheet's averaged year length.
+
+        Acceptable inputs:
+            start & end
+                arrays/lists of dates (anything date_array() accepts), or single dates,
+                broadcast against each other. end defaults to today.
+    '''
+    start = date_array(start)
+    if end is False:
+        end = np.datetime64(datetime.date.today(),'D')
+    end = date_array(end)
+    start,end = np.broadcast_arrays(start,end)
+    basis = _basis(basis)
+    days = (end - start).astype(np.int64)
+
+    if basis == 'ACT/360':
+        fraction = days / 360
+    elif basis == 'ACT/365':
+        fraction = days / 365
+    elif basis == 'ACT/ACT':
+        #   whole years between the years' starts, plus the fractions of the first and
+        #   last years at their own lengths
+        first,last = np.minimum(start,end),np.maximum(start,end)
+        year_first = first.astype('datetime64[Y]')
+        year_last = last.astype('datetime64[Y]')
+        length_first = ((year_first + 1).astype('datetime64[D]') - year_first.astype('datetime64[D]')).astype(np.int64)
+        length_last = ((year_last + 1).astype('datetime64[D]') - year_last.astype('datetime64[D]')).astype(np.int64)
+        fraction = ((year_last - year_first).astype(np.int64) - 1
+                    + ((year_first + 1).astype('datetime64[D]') - first).astype(np.int64) / length_first
+                    + (last - year_last.astype('datetime64[D]')).astype(np.int64) / length_last)
+        fraction = np.where(end < start,-fraction,fraction)
+    else:
+        y1,m1,d1 = _ymd64(start)
+        y2,m2,d2 = _ymd64(end)
+        if basis == '30/360US':
+            #   end of February rules, the end date's first as it tests the start's
+            february1 = (m1 == 2) & ((start + 1).astype('datetime64[M]') != start.astype('datetime64[M]'))
+            february2 = (m2 == 2) & ((end + 1).astype('datetime64[M]') != end.astype('datetime64[M]'))
+            d2 = np.where(february1 & february2,30,d2)
+            d1 = np.where(february1,30,d1)
+        if basis in ('30/360','30/360US'):
+            d1 = np.minimum(d1,30)
+            d2 = np.where((d2 == 31) & (d1 == 30),30,d2)
+        else:
+            d1 = np.minimum(d1,30)
+            d2 = np.minimum(d2,30)
+        fraction = (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)) / 360
+
+    return fraction
+
 def year(varIn=False):
     # docstring
     'Returns the year of today or the given date'
@@ -219,11 +480,22 @@ def julian(varIn=False):
     '''
     if varIn == False:
         mid = date()
-        start = year()
     else:
         mid = date(varIn)
-        start = date(mid.year)
-    julian = datedif(mid,start,period='Days',exact=False) + 1
+    #   days since January 1st of the same year, by ordinal
+    julian = mid.toordinal() - datetime.date(mid.year,1,1).toordinal() + 1
+    return julian
+
+def julian_array(dates=False):
+    # docstring
+    '''
+        Vectorized julian(): returns the day of the year (1-366) of each of dates (defaults
+        to today) as a NumPy integer array.
+    '''
+    if dates is False:
+        dates = np.datetime64(datetime.date.today(),'D')
+    days = date_array(dates)
+    julian = (days - days.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
     return julian
 
 def dateMath(date1=False,years=0,months=0,weeks=0,days=0):
@@ -241,7 +513,8 @@ def dateMath(date1=False,years=0,months=0,weeks=0,days=0):
             target month has fewer days than beginning month, i.e. 20170131 + 1 month (there is no day 31 in February),
             formula defaults to the last day of the answer month. So the formula would return 20170228 in a non leap-year.
 
-            All inputs must be integers
+            years and months are counted in whole months, rounded to the nearest (years=0.5 is
+            6 months), so whole-valued floats work like integers
     '''
     if date1 == False:
         date1 = date()
@@ -251,24 +524,44 @@ def dateMath(date1=False,years=0,months=0,weeks=0,days=0):
     stMo = date1.month
     stDy = date1.day
 
-    #   year & month
-    start_date = stYr + (stMo - 1) / 12
-    add_date = years + months / 12
-    end_date = start_date + add_date
-
-    nwYr = floor(end_date)
-    nwMo = round((end_date - nwYr) * 12 + 1,0)
+    #   year & month, counted in whole months, with the day clamped to the answer month
+    end_month = int(round(stYr * 12 + stMo - 1 + years * 12 + months))
+    nwYr = end_month // 12
+    nwMo = end_month % 12 + 1
+    nwDy = min(stDy,calendar.monthrange(nwYr,nwMo)[1])
 
-    end_date = date(nwYr,nwMo,stDy) + datetime.timedelta(days = days, weeks = weeks)
+    end_date = date(nwYr,nwMo,nwDy) + datetime.timedelta(days = days, weeks = weeks)
     answer = end_date
     return answer
 
 def weekNum(varIn=False):
-    ''' returns the weekNum of today or the date passed by to the function'''
+    '''
+        returns the ISO 8601 week number of today or the date passed to the function.
+        Weeks start on Monday and week 1 is the week with the year's first Thursday, so
+        the first days of January can be in week 52 or 53 of the year before, and the
+        last days of December in week 1 of the next year.
+    '''
     if varIn == False:
         temp = date()
     else:
         temp = date(varIn)
+    #   a week belongs to the year of its Thursday, and is numbered by that Thursday's
+    #   day of the year
+    thursday = temp.toordinal() + 3 - temp.weekday()
+    weekNum = (thursday - datetime.date.fromordinal(thursday).replace(month=1,day=1).toordinal()) // 7 + 1
+    return weekNum
+
+def weekNum_array(dates=False):
+    # docstring
+    '''
+        Vectorized weekNum(): returns the ISO 8601 week number (1-53) of each of dates
+        (defaults to today) as a NumPy integer array.
+    '''
+    if dates is False:
+        dates = np.datetime64(datetime.date.today(),'D')
+    days = date_array(dates)
+    thursday = days + (3 - _weekday64(days))
+    weekNum = (thursday - thursday.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) // 7 + 1
     return weekNum
 
 def eoMonth(varIn=False):
@@ -280,9 +573,391 @@ def eoMonth(varIn=False):
         temp = date()
     else:
         temp = date(varIn)
-    ans_year = dateMath(temp,months=1).year
-    ans_mnth = dateMath(temp,months=1).month
-    ans_date = dateMath(date1 = ans_year,month=ans_mnth)
+    #   the day before the start of next month
+    eom = dateMath(date(temp.year,temp.month),months=1,days=-1)
+    return eom
+
+def dateMath_array(dates=False,years=0,months=0,weeks=0,days=0):
+    # docstring
+    '''
+        Vectorized dateMath(): adds/subtracts years, months, weeks, and days to arrays of
+        dates and returns a NumPy datetime64[D] array. Years and months are added as whole
+        months with the day clamped to the end of the answer month (20170131 + 1 month is
+        20170228), then weeks and days. Integer month arithmetic over datetime64 days, so
+        a whole payment schedule rolls forward in one call.
 
-    eom = dateMath(date1=ans_date,days=-1)
+        Inputs:
+            dates               Optional, defaults to today; anything date_array() accepts
+            years, months, weeks, days
+                                Optional integers, or integer arrays broadcast against dates.
+                                years and months are rounded to whole months as in dateMath().
+    '''
+    if dates is False:
+        dates = np.datetime64(datetime.date.today(),'D')
+    dates = date_array(dates)
+    offset = np.rint(np.asarray(years,dtype=float) * 12 + np.asarray(months,dtype=float)).astype(np.int64)
+    shift = np.asarray(weeks,dtype=np.int64) * 7 + np.asarray(days,dtype=np.int64)
+    answer = _add_months64(dates,offset) + shift.astype('timedelta64[D]')
+    return answer
+
+def eoMonth_array(dates=False):
+    # docstring
+    '''
+        Vectorized eoMonth(): returns the last day of the month of each of dates (defaults
+        to today) as a NumPy datetime64[D] array.
+    '''
+    if dates is False:
+        dates = np.datetime64(datetime.date.today(),'D')
+    month = date_array(dates).astype('datetime64[M]')
+    eom = (month + 1).astype('datetime64[D]') - np.timedelta64(1,'D')
     return eom
+
+def schedule(start=False,q_per_t=12,count=False,end=False,annuity_due=False,eom=False):
+    # docstring
+    '''
+        Generates recurring dates, e.g. the payment dates of a loan, one at a time: q_per_t
+        dates per year from start, until count dates have been generated or the next would
+        fall after end (whichever is first; with neither the generator never ends). Each
+        date is computed from start itself, so month-end clamping never drifts: a schedule
+        from January 31st gives February 28th, then March 31st.
+
+        q_per_t and annuity_due follow business.py: payments are q_per_t times per year and
+        the first is one period after start, or on start itself if annuity_due == True.
+
+        Inputs:
+            start       = first date of the schedule (see date()), defaults to today
+            q_per_t     = dates per year. Month based if 12 / q_per_t is a whole number of
+                        months (12, 6, 4, 3, 2, 1, 0.5, ...), otherwise day based if 364 /
+                        q_per_t is a whole number of days (52 weekly, 26 every two weeks, ...)
+            count       = number of dates (0 gives none), defaults to no limit
+            end         = last date allowed (see date())
+            annuity_due = True to start on start, defaults to False
+            eom         = True to keep to month ends when start is the last day of its month
+    '''
+    start = date(start)
+    step,unit = _schedule_step(q_per_t)
+    if end != False:
+        end = date(end)
+    if eom == True and unit == 'M':
+        eom = start.day == calendar.monthrange(start.year,start.month)[1]
+
+    k = 0 if annuity_due == True else 1
+    generated = 0
+    while count is False or generated < count:
+        if unit == 'M':
+            answer = dateMath(start,months=k * step)
+            if eom == True:
+                answer = eoMonth(answer)
+        else:
+            answer = dateMath(start,days=k * step)
+        if end != False and answer > end:
+            return
+        yield answer
+        k += 1
+        generated += 1
+
+def schedule_array(start=False,q_per_t=12,count=False,end=False,annuity_due=False,eom=False):
+    # docstring
+    '''
+        Array version of schedule(): returns the whole schedule as a NumPy datetime64[D]
+        array computed in one pass. count and/or end must be given; see schedule() for the
+        arguments.
+    '''
+    if start is False:
+        start = np.datetime64(datetime.date.today(),'D')
+    start = date_array([start])[0]
+    step,unit = _schedule_step(q_per_t)
+    if end != False:
+        end = date_array([end])[0]
+    first = 0 if annuity_due == True else 1
+
+    #   without count, enough periods to pass end
+    if count is False:
+        if end == False:
+            raise ValueError('schedule_array() needs count or end')
+        if unit == 'M':
+            span = (end.astype('datetime64[M]') - start.astype('datetime64[M]')).astype(np.int64)
+        else:
+            span = (end - start).astype(np.int64)
+        count = max(0,span // step + 1 - first + 1)
+
+    periods = (np.arange(count,dtype=np.int64) + first) * step
+    if unit == 'M':
+        answer = _add_months64(np.full(count,start),periods)
+        if eom == True and eoMonth_array(start) == start:
+            answer = eoMonth_array(answer)
+    else:
+        answer = start + periods.astype('timedelta64[D]')
+    if end != False:
+        answer = answer[answer <= end]
+    return answer
+
+def holiday_calendar(rules=US_FEDERAL,start_year=1970,end_year=2099,weekmask='1111100',holidays=()):
+    # docstring
+    '''
+        Compiles holiday rules for the years start_year to end_year into a business-day
+        calendar that is_busday(), busday_count(), busday_add(), and busday_adjust() take.
+        Every rule is evaluated for all years at once and the dates are kept as one sorted
+        index (a numpy.busdaycalendar), so each lookup is a binary search.
+
+        Inputs:
+            rules       = HolidayRules, defaults to US_FEDERAL; () for weekends only
+            start_year, end_year
+                        = years covered, inclusive
+            weekmask    = working days Monday to Sunday, '1111100' is Monday to Friday
+            holidays    = any other holiday dates (anything date_array() accepts)
+
+        Example, a custom calendar:
+            holiday_calendar(US_FEDERAL + (HolidayRule('Good Friday',easter=-2),))
+    '''
+    years = np.arange(start_year,end_year + 1)
+    dates = [_holiday_dates(rule,years) for rule in rules]
+    dates.append(date_array(list(holidays)).ravel())
+    dates = np.unique(np.concatenate(dates))
+    return np.busdaycalendar(weekmask=weekmask,holidays=dates[~np.isnat(dates)])
+
+def is_busday(dates,holidays=False):
+    # docstring
+    '''
+        Returns whether each of dates is a business day of the calendar holidays (from
+        holiday_calendar(), defaults to Monday to Friday with no holidays).
+    '''
+    return np.is_busday(date_array(dates),busdaycal=_busdays(holidays))
+
+def busday_count(start,end,holidays=False):
+    # docstring
+    '''
+        Returns the number of business days from start up to, but not including, end
+        (negative if end is before start), for arrays or single dates. See is_busday() for
+        holidays.
+    '''
+    return np.busday_count(date_array(start),date_array(end),busdaycal=_busdays(holidays))
+
+def busday_add(dates,n,holidays=False,roll='following'):
+    # docstring
+    '''
+        Adds n business days (negative to subtract) to each of dates. Dates that are not
+        business days are first adjusted by roll ('following', 'preceding', 'modified
+        following', or 'modified preceding', see busday_adjust()). See is_busday() for
+        holidays.
+    '''
+    return np.busday_offset(date_array(dates),n,roll=_roll(roll),busdaycal=_busdays(holidays))
+
+def busday_adjust(dates,convention='following',holidays=False):
+    # docstring
+    '''
+        Moves each of dates that is not a business day to one that is, by convention:
+            'following'             - the next business day
+            'preceding'             - the previous business day
+            'modified following'    - the next business day, unless that is in the next
+                                    month, then the previous business day
+            'modified preceding'    - the previous business day, unless that is in the
+                                    previous month, then the next business day
+        See is_busday() for holidays.
+    '''
+    return np.busday_offset(date_array(dates),0,roll=_roll(convention),busdaycal=_busdays(holidays))
+
+def _date64(value):
+    # No docstring
+    # Internal library function. date() of value as a datetime64[D], NaT if blank.
+    day = date(value)
+    if day == '':
+        day = 'NaT'
+    return np.datetime64(day,'D')
+
+def _ymd_to_datetime64(y,m,d):
+    # No docstring
+    # Internal library function. datetime64[D] array of the dates with years y,
+    # months m, and days d (integer arrays). Days past the end of a month roll over.
+    months = (np.asarray(y,dtype=np.int64) - 1970) * 12 + np.asarray(m,dtype=np.int64) - 1
+    days = np.asarray(d,dtype=np.int64) - 1
+    return months.astype('datetime64[M]').astype('datetime64[D]') + days.astype('timedelta64[D]')
+
+def _parse_fixed(values):
+    # No docstring
+    # Internal library function. Converts the strings/integers in values written as
+    # YYYYMMDD, YYYYMM, YYYY, MM/DD/YYYY, or YYYY-MM-DD to a datetime64[D] array in
+    # bulk. Values in no fixed format, or not a valid date, are NaT.
+    text = np.char.strip(values.astype(str))
+    length = np.char.str_len(text)
+    y = np.zeros(len(text),dtype=np.int64)
+    m = np.ones(len(text),dtype=np.int64)
+    d = np.ones(len(text),dtype=np.int64)
+
+    #   digits only: YYYYMMDD, YYYYMM, or YYYY
+    digits = np.char.isdigit(text) & np.isin(length,(4,6,8))
+    number = np.zeros(len(text),dtype=np.int64)
+    number[digits] = text[digits].astype(np.int64)
+    scale = np.where(length == 8,10000,np.where(length == 6,100,1))
+    y = np.where(digits,number // scale,y)
+    m = np.where(digits & (length > 4),number // np.maximum(scale // 100,1) % 100,m)
+    d = np.where(digits & (length == 8),number % 100,d)
+    known = digits
+
+    #   MM/DD/YYYY and YYYY-MM-DD, where M and D may be 1 or 2 digits for MM/DD/YYYY
+    for separator,lengths,order in (('/',((1,2),(1,2),(4,)),(1,2,0)),('-',((4,),(2,),(2,)),(0,1,2))):
+        parts = np.char.partition(text,separator)
+        rest = np.char.partition(parts[:,2],separator)
+        fields = [parts[:,0],rest[:,0],rest[:,2]]
+        found = (parts[:,1] == separator) & (rest[:,1] == separator) & ~known
+        for field,allowed in zip(fields,lengths):
+            found &= np.char.isdigit(field) & np.isin(np.char.str_len(field),allowed)
+        if not found.any():
+            continue
+        numbers = [np.where(found,field,'0').astype(np.int64) for field in fields]
+        y = np.where(found,numbers[order[0]],y)
+        m = np.where(found,numbers[order[1]],m)
+        d = np.where(found,numbers[order[2]],d)
+        known |= found
+
+    #   keep only real dates: months 1-12, and days that do not roll into the next month
+    valid = known & (y >= 1) & (m >= 1) & (m <= 12) & (d >= 1) & (d <= 31)
+    days = np.full(len(text),np.datetime64('NaT'),dtype='datetime64[D]')
+    if valid.any():
+        days[valid] = _ymd_to_datetime64(y[valid],m[valid],d[valid])
+        rolled = days[valid].astype('datetime64[M]') != _ymd_to_datetime64(y[valid],m[valid],1).astype('datetime64[M]')
+        days[np.nonzero(valid)[0][rolled]] = np.datetime64('NaT')
+    return days
+
+def _period(period):
+    # No docstring
+    # Internal library function. Cleans datedif()'s period argument to one of 'm',
+    # 'y', 'w', or 'd'.
+    period = str(period)
+    if((period[0].lower()=='m') or (period=='2') or (period=='12')):
+        period='m'
+    elif((period=='1') or (period[0].lower()=='y') or (period[0].lower()=='a')):
+        period='y'
+    elif((period=='3') or (period=='52') or (period[0].lower()=='w')):
+        period='w'
+    else:
+        period='d'
+    return period
+
+def _exact(exact):
+    # No docstring
+    # Internal library function. Cleans datedif()'s exact argument to True or False.
+    if (exact==False or str(exact)[0]=='0' or str(exact)[0]=='n'):
+        exact=False
+    else:
+        exact=True
+    return exact
+
+def _add_months64(days,months):
+    # No docstring
+    # Internal library function. datetime64[D] array days moved by integer months,
+    # with days past the end of the target month clamped to its last day.
+    month = days.astype('datetime64[M]')
+    day = days - month.astype('datetime64[D]')
+    target = month + np.asarray(months).astype('timedelta64[M]')
+    start = target.astype('datetime64[D]')
+    length = (target + 1).astype('datetime64[D]') - start
+    return start + np.minimum(day,length - np.timedelta64(1,'D'))
+
+def _parse(text):
+    # No docstring
+    # Internal library function. date() of a single date written as text, at least 4
+    # characters long: YYYYMM, YYYY, or anything dateutil's parser reads.
+    if len(text) == 6 and text.isdigit():
+        return datetime.datetime(int(text[:4]),int(text[4:]),1)
+    elif len(text) > 4:
+        return parser.parse(text)
+    return datetime.datetime(int(text),1,1)
+
+#   the parse cache under date(), see set_date_cache()
+_cached_parse = lru_cache(maxsize=4096)(_parse)
+
+def _schedule_step(q_per_t):
+    # No docstring
+    # Internal library function. The length of one of q_per_t periods per year, as
+    # (months,'M') or, when a year does not split into whole months, (days,'D').
+    months = 12 / q_per_t
+    if months == int(months):
+        return int(months),'M'
+    days = 364 / q_per_t
+    if days == int(days):
+        return int(days),'D'
+    raise ValueError('q_per_t must split a year into whole months or a 364 day year into whole days')
+
+def _busdays(holidays):
+    # No docstring
+    # Internal library function. The business-day calendar holidays, or Monday to
+    # Friday without holidays if not given.
+    if holidays is False:
+        return np.busdaycalendar()
+    return holidays
+
+def _roll(convention):
+    # No docstring
+    # Internal library function. Cleans a business-day convention to numpy's roll
+    # name: 'following', 'preceding', 'modified following', or 'modified preceding'.
+    convention = str(convention).lower().replace(' ','').replace('_','').replace('-','')
+    rolls = {'following':'forward','preceding':'backward','modifiedfollowing':'modifiedfollowing',
+             'modifiedpreceding':'modifiedpreceding','forward':'forward','backward':'backward'}
+    if convention not in rolls:
+        raise ValueError('unknown business day convention: ' + convention)
+    return rolls[convention]
+
+def _holiday_dates(rule,years):
+    # No docstring
+    # Internal library function. datetime64[D] array of the dates of HolidayRule rule
+    # in each of years.
+    if rule.first_year is not None:
+        years = years[years >= rule.first_year]
+
+    if rule.easter is not None:
+        #   Easter Sunday by the anonymous Gregorian algorithm
+        a = years % 19
+        b,c = years // 100,years % 100
+        d,e = b // 4,b % 4
+        g = (8 * b + 13) // 25
+        h = (19 * a + b - d - g + 15) % 30
+        i,k = c // 4,c % 4
+        l = (32 + 2 * e + 2 * i - h - k) % 7
+        m = (a + 11 * h + 19 * l) // 433
+        month = (h + l - 7 * m + 90) // 25
+        day = (h + l - 7 * m + 33 * month + 19) % 32
+        return _ymd_to_datetime64(years,month,day) + np.timedelta64(rule.easter,'D')
+
+    if rule.weekday is not None:
+        #   nth weekday from the first of the month, or from the end for n < 0
+        if rule.n > 0:
+            first = _ymd_to_datetime64(years,rule.month,1)
+            return first + ((rule.weekday - _weekday64(first)) % 7 + 7 * (rule.n - 1)).astype('timedelta64[D]')
+        last = eoMonth_array(_ymd_to_datetime64(years,rule.month,1))
+        return last - ((_weekday64(last) - rule.weekday) % 7 + 7 * (-rule.n - 1)).astype('timedelta64[D]')
+
+    days = _ymd_to_datetime64(years,rule.month,rule.day)
+    if rule.observed:
+        weekday = _weekday64(days)
+        days = days + np.where(weekday == 5,-1,np.where(weekday == 6,1,0)).astype('timedelta64[D]')
+    return days
+
+def _weekday64(days):
+    # No docstring
+    # Internal library function. Day of the week of datetime64[D] days, 0 = Monday
+    # (1970-01-01 was a Thursday).
+    return (days.astype(np.int64) + 3) % 7
+
+def _basis(basis):
+    # No docstring
+    # Internal library function. Cleans a day-count convention (name or spreadsheet
+    # YEARFRAC code) to '30/360', '30/360US', '30E/360', 'ACT/360', 'ACT/365', or 'ACT/ACT'.
+    codes = {'0':'30/360US','1':'ACT/ACT','2':'ACT/360','3':'ACT/365','4':'30E/360'}
+    basis = str(basis).upper().replace(' ','')
+    basis = codes.get(basis,basis).replace('ACTUAL','ACT')
+    if basis in ('ACT/365F','ACT/365FIXED'):
+        basis = 'ACT/365'
+    if basis in ('30/360NASD','30U/360'):
+        basis = '30/360US'
+    if basis not in ('30/360','30/360US','30E/360','ACT/360','ACT/365','ACT/ACT'):
+        raise ValueError('unknown day count basis: ' + basis)
+    return basis
+
+def _ymd64(days):
+    # No docstring
+    # Internal library function. Integer arrays of the years, months, and days of the
+    # datetime64[D] array days.
+    month = days.astype('datetime64[M]')
+    index = month.astype(np.int64)
+    return index // 12 + 1970,index % 12 + 1,(days - month.astype('datetime64[D]')).astype(np.int64) + 1
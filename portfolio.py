@@ -0,0 +1,169 @@
+# docstring
+'''
+    Runs the business.py TVM functions over large portfolios of jobs in parallel.
+
+    Contains the following functions:
+    run_portfolio() - values a table of pv/fv/solve_t/solve_q/solve_r jobs across processes
+    load_jobs()     - reads a table of jobs from a CSV, NumPy, or Parquet file
+'''
+
+# imports
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import os
+import numpy as np
+import business
+
+# Functions
+def run_portfolio(function,jobs,workers=False,chunk_size=False,**constants):
+    # docstring
+    '''
+        Function Description:
+            Runs function over every row (job) of jobs and returns a NumPy array of the answers,
+            in the order of the jobs. The table is copied once into shared memory and split into
+            chunks that worker processes read in place, so no job is pickled; each worker writes
+            its answers straight into a shared result array.
+
+            pv, fv, solve_t, and solve_q jobs are valued a chunk at a time by the vectorized
+            pv_batch(), fv_batch(), solve_t_batch(), and solve_q_batch(). solve_r jobs are solved
+            one at a time by solve_r(), which is CPU bound, so they gain the most from more
+            processes.
+
+        Calculation assumptions:
+            Each column of jobs is an argument of function, named as in business.py. A 0 or nan
+            in a column means the argument is not given for that job (False in business.py).
+            Arguments that are the same for every job, e.g. r_is or precision, are passed as
+            keyword arguments. solve_r returns i unless get is passed.
+
+        Variable/argument Description:
+            function    = 'pv', 'fv', 'solve_t', 'solve_q', or 'solve_r'
+            jobs        = table of jobs, one per row
+            workers     = number of processes, defaults to the number of CPUs. With 1 worker
+                        the jobs run in this process.
+            chunk_size  = jobs per chunk, defaults to splitting the jobs into 4 chunks per worker
+            constants   = arguments passed to every job
+
+        Acceptable argument inputs:
+            jobs        : NumPy structured/record array, dict of equal length columns, or the
+                        path of a file load_jobs() reads
+            workers & chunk_size : int
+    '''
+
+    # Function Body
+    if isinstance(jobs,(str,os.PathLike)):
+        jobs = load_jobs(jobs)
+    table = _job_table(jobs)
+    rows = len(table)
+    if workers == False:
+        workers = os.cpu_count() or 1
+    if chunk_size == False:
+        chunk_size = max(1,-(-rows // (workers * 4)))
+    chunks = [(start,min(start + chunk_size,rows)) for start in range(0,rows,chunk_size)]
+
+    #   a single worker runs the chunks in this process
+    if workers == 1 or rows == 0:
+        answer = np.empty(rows)
+        for start,stop in chunks:
+            answer[start:stop] = _job_values(function,table[start:stop],constants)
+        return answer
+
+    #   share the jobs and the answers with the workers
+    jobs_memory = SharedMemory(create=True,size=max(1,table.nbytes))
+    answer_memory = SharedMemory(create=True,size=max(1,rows * 8))
+    try:
+        shared = np.ndarray(table.shape,dtype=table.dtype,buffer=jobs_memory.buf)
+        shared[:] = table
+        del shared
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_job_chunk,function,table.dtype.names,rows,jobs_memory.name,answer_memory.name,start,stop,constants)
+                       for start,stop in chunks]
+            for future in futures:
+                future.result()
+        answer = np.ndarray((rows,),dtype=float,buffer=answer_memory.buf).copy()
+    finally:
+        jobs_memory.close()
+        jobs_memory.unlink()
+        answer_memory.close()
+        answer_memory.unlink()
+
+    return answer
+
+def load_jobs(path):
+    # docstring
+    '''
+        Returns the table of jobs saved at path as a NumPy structured array, for run_portfolio().
+        Reads .npy files (a structured array), .csv files with a header row of argument names,
+        and .parquet files, which need pyarrow installed.
+    '''
+    path = os.fspath(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        jobs = np.load(path)
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('reading parquet jobs requires pyarrow') from None
+        columns = pyarrow.parquet.read_table(path).to_pydict()
+        jobs = _job_table(columns)
+    else:
+        jobs = np.genfromtxt(path,delimiter=',',names=True,dtype=float,ndmin=1)
+    return jobs
+
+def _job_table(jobs):
+    # No docstring
+    # Internal library function. The jobs as a float64 structured array, one field per
+    # argument, from a structured array or a dict of columns.
+    if isinstance(jobs,dict):
+        names = list(jobs)
+        columns = [np.asarray(jobs[name],dtype=float) for name in names]
+    else:
+        jobs = np.asarray(jobs)
+        names = list(jobs.dtype.names)
+        columns = [jobs[name].astype(float) for name in names]
+    table = np.empty(len(columns[0]) if columns else 0,dtype=[(name,'f8') for name in names])
+    for name,column in zip(names,columns):
+        table[name] = column
+    return table
+
+def _job_values(function,table,constants):
+    # No docstring
+    # Internal library function. Answers for a chunk of jobs, by the batch function for
+    # pv/fv/solve_t/solve_q and one solve_r() call per job for solve_r.
+    columns = {name:np.nan_to_num(table[name]) for name in table.dtype.names}
+    if 'annuity_due' in columns:
+        columns['annuity_due'] = columns['annuity_due'] != 0
+    if 'sinking_fund' in columns:
+        columns['sinking_fund'] = columns['sinking_fund'] != 0
+
+    if function != 'solve_r':
+        batch = getattr(business,function + '_batch')
+        return batch(**columns,**constants)
+
+    #   solve_r() takes one job at a time, with t as a whole number of payments
+    constants = dict(constants)
+    constants.setdefault('get','i')
+    if 't' in columns:
+        columns['t'] = columns['t'].astype(int)
+    answer = np.empty(len(table))
+    for k,values in enumerate(zip(*(column.tolist() for column in columns.values()))):
+        row = {name:(value if value else False) for name,value in zip(columns,values)}
+        answer[k] = business.solve_r(**row,**constants)
+    return answer
+
+def _job_chunk(function,names,rows,jobs_name,answer_name,start,stop,constants):
+    # No docstring
+    # Internal library function. Worker process body: values jobs[start:stop] from the
+    # shared jobs table into the shared answers.
+    jobs_memory = SharedMemory(name=jobs_name)
+    answer_memory = SharedMemory(name=answer_name)
+    try:
+        table = np.ndarray((rows,),dtype=[(name,'f8') for name in names],buffer=jobs_memory.buf)
+        values = _job_values(function,table[start:stop],constants)
+        del table
+        answer = np.ndarray((rows,),dtype=float,buffer=answer_memory.buf)
+        answer[start:stop] = values
+        del answer
+    finally:
+        jobs_memory.close()
+        answer_memory.close()